@@ -1,7 +1,105 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+import argparse
 import csv
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json_codec
+from paged_preview import PagedPreview
+
+# Rows converted between two progress callbacks
+PROGRESS_INTERVAL = 1000
+
+def parse_bool(value):
+    """Parse the usual textual spellings of a boolean."""
+    lowered = value.strip().lower()
+    if lowered in ("true", "t", "yes", "y", "1"):
+        return True
+    if lowered in ("false", "f", "no", "n", "0"):
+        return False
+    raise ValueError(f"invalid boolean value: {value!r}")
+
+SCHEMA_TYPES = {"int": int, "float": float, "bool": parse_bool, "str": str}
+
+def load_schema(schema_path):
+    """Load a ``{"column": "int" | "float" | "bool" | "str"}`` JSON schema into casters."""
+    with open(schema_path, "r") as schema_file:
+        schema = json_codec.load(schema_file)
+    unknown = {column: kind for column, kind in schema.items() if kind not in SCHEMA_TYPES}
+    if unknown:
+        raise ValueError(f"Unsupported schema types {unknown}; expected one of {', '.join(SCHEMA_TYPES)}")
+    return {column: SCHEMA_TYPES[kind] for column, kind in schema.items()}
+
+def iter_csv_records(csv_file, casters=None):
+    """Yield CSV rows as dicts, casting the columns listed in ``casters``.
+
+    Empty cells in typed columns become None.
+    """
+    reader = csv.DictReader(csv_file)
+    for row in reader:
+        for column, cast in (casters or {}).items():
+            value = row.get(column)
+            if value is None or value == "":
+                row[column] = None
+                continue
+            try:
+                row[column] = cast(value)
+            except ValueError as e:
+                raise ValueError(f"Line {reader.line_num}, column {column!r}: {e}") from None
+        yield row
+
+def iter_csv_file(csv_file_path, casters=None):
+    """Yield the records of a CSV file lazily, keeping the file open only while iterating."""
+    with open(csv_file_path, "r", newline="") as csv_file:
+        yield from iter_csv_records(csv_file, casters)
+
+def count_csv_records(csv_file_path):
+    """Count data rows with the plain csv reader, without building dicts."""
+    with open(csv_file_path, "r", newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        # The first row is the header, as in DictReader
+        if next(reader, None) is None:
+            return 0
+        # Blank lines come back as [] and DictReader skips them
+        return sum(1 for row in reader if row)
+
+def stream_csv_to_json(csv_file_path, json_file_path, output_format="array", indent=None, casters=None, progress_callback=None, sort_keys=False, ensure_ascii=True):
+    """Convert a CSV file to JSON one record at a time.
+
+    ``output_format`` is ``"array"`` for a single JSON array or ``"ndjson"`` for
+    one compact record per line. ``indent`` pretty-prints array output the same
+    way ``json.dump(records, indent=indent)`` would; None writes compact JSON.
+    ``sort_keys`` and ``ensure_ascii`` behave as in ``json.dumps``.
+    ``progress_callback(bytes_read, total_bytes)`` is called periodically.
+    Returns the number of records written.
+    """
+    total_bytes = os.path.getsize(csv_file_path)
+    if output_format == "ndjson":
+        indent = None
+    opening, separator = ("[", ",") if indent is None else ("[\n", ",\n")
+    count = 0
+    with open(csv_file_path, "r", newline="") as csv_file, open(json_file_path, "w") as json_file:
+        for record in iter_csv_records(csv_file, casters):
+            text = json_codec.dumps(record, indent, sort_keys, ensure_ascii, level=1)
+            if output_format == "ndjson":
+                json_file.write(text)
+                json_file.write("\n")
+            else:
+                json_file.write(separator if count else opening)
+                json_file.write(text)
+            count += 1
+            if progress_callback and count % PROGRESS_INTERVAL == 0:
+                progress_callback(csv_file.buffer.tell(), total_bytes)
+        if output_format != "ndjson":
+            if not count:
+                json_file.write("[]")
+            else:
+                json_file.write("]" if indent is None else "\n]")
+    if progress_callback:
+        progress_callback(total_bytes, total_bytes)
+    return count
 
 class CsvToJsonConverter:
     def __init__(self, root):
@@ -24,7 +122,7 @@ class CsvToJsonConverter:
         self.progress = ttk.Progressbar(root, orient=tk.HORIZONTAL, length=400, mode='determinate')
         self.progress.pack(pady=20)
 
-        self.csv_data = None
+        self.csv_path = None
         self.headers = None
 
     def open_csv(self):
@@ -33,10 +131,9 @@ class CsvToJsonConverter:
         )
         if file_path:
             try:
-                with open(file_path, "r") as file:
-                    reader = csv.DictReader(file)
-                    self.headers = reader.fieldnames
-                    self.csv_data = list(reader)
+                with open(file_path, "r", newline="") as file:
+                    self.headers = csv.DictReader(file).fieldnames
+                self.csv_path = file_path
                 messagebox.showinfo("Success", "CSV file loaded successfully!")
                 self.preview_button.config(state=tk.NORMAL)
                 self.convert_button.config(state=tk.NORMAL)
@@ -44,18 +141,16 @@ class CsvToJsonConverter:
                 messagebox.showerror("Error", f"Failed to load CSV file: {e}")
 
     def preview_csv(self):
-        if self.csv_data:
-            preview_window = tk.Toplevel(self.root)
-            preview_window.title("CSV Data Preview")
-            preview_window.geometry("500x300")
-            
-            text_area = tk.Text(preview_window, wrap=tk.WORD)
-            text_area.pack(expand=True, fill=tk.BOTH)
-            text_area.insert(tk.END, json.dumps(self.csv_data, indent=4))
-            text_area.config(state=tk.DISABLED)
+        if self.csv_path:
+            csv_path = self.csv_path
+            PagedPreview(self.root, "CSV Data Preview", lambda: iter_csv_file(csv_path), lambda: count_csv_records(csv_path))
+
+    def update_progress(self, bytes_read, total_bytes):
+        self.progress['value'] = bytes_read * 100 / total_bytes if total_bytes else 100
+        self.root.update_idletasks()
 
     def convert_to_json(self):
-        if self.csv_data:
+        if self.csv_path:
             save_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
                 filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
@@ -65,15 +160,38 @@ class CsvToJsonConverter:
                     self.progress['value'] = 0
                     self.root.update_idletasks()
 
-                    with open(save_path, "w") as json_file:
-                        json.dump(self.csv_data, json_file, indent=4)
-                        self.progress['value'] = 100
-                        self.root.update_idletasks()
-                        messagebox.showinfo("Success", "JSON file saved successfully!")
+                    stream_csv_to_json(self.csv_path, save_path, indent=4, progress_callback=self.update_progress)
+                    self.progress['value'] = 100
+                    self.root.update_idletasks()
+                    messagebox.showinfo("Success", "JSON file saved successfully!")
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save JSON file: {e}")
 
+def run_headless(args):
+    casters = load_schema(args.schema) if args.schema else None
+    indent = None if args.compact else args.indent
+    count = stream_csv_to_json(args.csv_file, args.json_file, args.format, indent, casters,
+                               sort_keys=args.sort_keys, ensure_ascii=not args.unicode)
+    print(f"Wrote {count} records to {args.json_file}")
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = CsvToJsonConverter(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Convert a CSV file to JSON. Starts the GUI when no files are given.")
+    parser.add_argument("csv_file", nargs="?", help="Path to the CSV file.")
+    parser.add_argument("json_file", nargs="?", help="Path to save the JSON file.")
+    parser.add_argument("--format", choices=["array", "ndjson"], default="array", help="Write a JSON array or JSON Lines (default: array).")
+    parser.add_argument("--indent", type=int, default=4, help="Indentation for array output (default: 4).")
+    parser.add_argument("--compact", action="store_true", help="Write array output without indentation or spaces.")
+    parser.add_argument("--schema", help="JSON file mapping column names to int, float, bool or str.")
+    parser.add_argument("--sort-keys", action="store_true", help="Write the keys of each record in sorted order.")
+    parser.add_argument("--unicode", action="store_true", help="Write non-ASCII characters as-is instead of \\u escapes.")
+    args = parser.parse_args()
+
+    if args.csv_file and args.json_file:
+        try:
+            run_headless(args)
+        except ValueError as e:
+            sys.exit(f"Error: {e}")
+    else:
+        root = tk.Tk()
+        app = CsvToJsonConverter(root)
+        root.mainloop()
@@ -1,6 +1,12 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pdfkit
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from asset_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, AssetCache
+from html_pdf import BACKENDS, HtmlPdfService, format_render_summary
 
 class HtmlToPdfConverter:
     def __init__(self, root):
@@ -123,9 +129,11 @@ class HtmlToPdfConverter:
                     self.progress['value'] = 0
                     self.root.update_idletasks()
 
-                    # Configure pdfkit to use wkhtmltopdf
-                    config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-                    pdfkit.from_file(self.html_path, save_path, options=self.pdf_options, configuration=config)
+                    # wkhtmltopdf from PATH, or weasyprint when it is not installed
+                    with HtmlPdfService(workers=1, options=self.pdf_options, asset_cache=AssetCache()) as service:
+                        summary = service.render_files([(self.html_path, save_path)])
+                    if summary["failed"]:
+                        raise RuntimeError(summary["failed"][0][1])
 
                     self.progress['value'] = 100
                     self.root.update_idletasks()
@@ -133,7 +141,71 @@ class HtmlToPdfConverter:
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save PDF file: {e}")
 
+def find_html_sources(sources, output_dir):
+    # (html_path, pdf_path) pairs; directories are searched recursively and
+    # mirrored into output_dir, PDFs go next to their HTML file by default
+    jobs = []
+    for source in sources:
+        if os.path.isdir(source):
+            for dirpath, dirnames, filenames in os.walk(source):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if name.lower().endswith(('.html', '.htm')):
+                        html_path = os.path.join(dirpath, name)
+                        relative = os.path.relpath(html_path, source)
+                        jobs.append((html_path, os.path.join(output_dir or source, os.path.splitext(relative)[0] + '.pdf')))
+        else:
+            name = os.path.splitext(os.path.basename(source))[0] + '.pdf'
+            jobs.append((source, os.path.join(output_dir or os.path.dirname(source), name)))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert HTML files to PDF. Without sources, opens the GUI.")
+    parser.add_argument("sources", nargs='*', help="HTML files or directories to convert.")
+    parser.add_argument("-o", "--output-dir", default=None, help="Directory for the PDF files (default: next to each HTML file).")
+    parser.add_argument("--backend", choices=BACKENDS, default=None, help="Renderer (default: wkhtmltopdf if on PATH, else weasyprint).")
+    parser.add_argument("--workers", type=int, default=None, help="Documents rendered at once (default: one per CPU core).")
+    parser.add_argument("--page-size", default=None, help="Page size, e.g. A4 or Letter.")
+    parser.add_argument("--margins", default=None, help="Margins as 'top,bottom,left,right', e.g. '10mm,10mm,15mm,15mm'.")
+    parser.add_argument("--asset-cache", default=DEFAULT_CACHE_DIR, help=f"Directory caching linked stylesheets, fonts and images (default: {DEFAULT_CACHE_DIR}).")
+    parser.add_argument("--asset-cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="Asset cache size limit in MB.")
+    parser.add_argument("--no-asset-cache", action="store_true", help="Let the renderer load every asset itself.")
+    args = parser.parse_args()
+
+    if not args.sources:
+        root = tk.Tk()
+        app = HtmlToPdfConverter(root)
+        root.mainloop()
+        return
+
+    missing = [source for source in args.sources if not os.path.exists(source)]
+    if missing:
+        print(f"Not found: {', '.join(missing)}")
+        exit(1)
+    options = {}
+    if args.page_size:
+        options['page-size'] = args.page_size
+    if args.margins:
+        margins = args.margins.split(',')
+        if len(margins) != 4:
+            print("--margins needs four comma-separated values.")
+            exit(1)
+        for side, margin in zip(('top', 'bottom', 'left', 'right'), margins):
+            options[f'margin-{side}'] = margin.strip()
+
+    jobs = find_html_sources(args.sources, args.output_dir)
+    for _, pdf_path in jobs:
+        os.makedirs(os.path.dirname(pdf_path) or '.', exist_ok=True)
+    asset_cache = None if args.no_asset_cache else AssetCache(args.asset_cache, args.asset_cache_size * 1024 * 1024)
+    try:
+        with HtmlPdfService(args.backend, args.workers, options, asset_cache) as service:
+            summary = service.render_files(jobs)
+    except RuntimeError as e:
+        print(e)
+        exit(1)
+    print(format_render_summary(summary, service.backend))
+    if summary["failed"]:
+        exit(1)
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = HtmlToPdfConverter(root)
-    root.mainloop()
+    main()
@@ -1,8 +1,78 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import json
+import argparse
 import csv
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json_codec
+from json_stream import iter_json_records
+
+def flatten_record(record, sep="."):
+    """Flatten nested objects into ``parent.child`` keys.
+
+    Lists are kept in a single cell as compact JSON; a record that is not an
+    object becomes ``{"value": record}``.
+    """
+    if not isinstance(record, dict):
+        return {"value": record}
+    flat = {}
+    # Stack of item iterators instead of recursion, so deeply nested records
+    # are safe and columns keep document order
+    stack = [("", iter(record.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for key, value in items:
+            name = f"{prefix}{sep}{key}" if prefix else str(key)
+            if isinstance(value, dict) and value:
+                stack.append((name, iter(value.items())))
+                break
+            if isinstance(value, (dict, list)):
+                flat[name] = json_codec.dumps(value)
+            else:
+                flat[name] = value
+        else:
+            stack.pop()
+    return flat
+
+def discover_columns(json_file_path, sep="."):
+    """First pass: the union of flattened keys over all records, in first-seen order."""
+    columns = {}
+    for record in iter_json_records(json_file_path):
+        for column in flatten_record(record, sep):
+            columns.setdefault(column)
+    return list(columns)
+
+def save_schema(columns, schema_path):
+    with open(schema_path, "w") as schema_file:
+        json_codec.dump({"columns": columns}, schema_file, indent=4)
+
+def load_schema(schema_path):
+    with open(schema_path, "r") as schema_file:
+        return json_codec.load(schema_file)["columns"]
+
+def stream_json_to_csv(json_file_path, csv_file_path, columns=None, sep=".", progress_callback=None):
+    """Convert a JSON array or NDJSON file to CSV with flat memory use.
+
+    Without ``columns`` a discovery pass collects the header union first; the
+    second pass streams every flattened record through ``csv.DictWriter`` so
+    records with different keys stay aligned. Keys missing from ``columns`` are
+    left out. ``progress_callback(records_written)`` is called every 1000 records.
+    Returns ``(columns, records_written)``.
+    """
+    if columns is None:
+        columns = discover_columns(json_file_path, sep)
+    count = 0
+    with open(csv_file_path, "w", newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=columns, restval="", extrasaction="ignore")
+        writer.writeheader()
+        for record in iter_json_records(json_file_path):
+            writer.writerow(flatten_record(record, sep))
+            count += 1
+            if progress_callback and count % 1000 == 0:
+                progress_callback(count)
+    return columns, count
 
 class JsonToCsvConverter:
     def __init__(self, root):
@@ -19,7 +89,7 @@ class JsonToCsvConverter:
         self.convert_button = tk.Button(root, text="Convert to CSV", command=self.convert_to_csv, state=tk.DISABLED)
         self.convert_button.pack(pady=10)
 
-        self.json_data = None
+        self.json_path = None
 
     def open_json(self):
         file_path = filedialog.askopenfilename(
@@ -27,39 +97,46 @@ class JsonToCsvConverter:
         )
         if file_path:
             try:
-                with open(file_path, "r") as file:
-                    self.json_data = json.load(file)
+                # Parse only the first record to validate the file; conversion streams it
+                next(iter_json_records(file_path), None)
+                self.json_path = file_path
                 messagebox.showinfo("Success", "JSON file loaded successfully!")
                 self.convert_button.config(state=tk.NORMAL)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load JSON file: {e}")
 
     def convert_to_csv(self):
-        if self.json_data:
+        if self.json_path:
             save_path = filedialog.asksaveasfilename(
                 defaultextension=".csv",
                 filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
             )
             if save_path:
                 try:
-                    with open(save_path, "w", newline='') as csv_file:
-                        csv_writer = csv.writer(csv_file)
-                        if isinstance(self.json_data, list):
-                            # Extract headers from keys of the first dictionary
-                            headers = self.json_data[0].keys()
-                            csv_writer.writerow(headers)
-                            for entry in self.json_data:
-                                csv_writer.writerow(entry.values())
-                        elif isinstance(self.json_data, dict):
-                            # Handle a single dictionary as a list with one element
-                            headers = self.json_data.keys()
-                            csv_writer.writerow(headers)
-                            csv_writer.writerow(self.json_data.values())
-                        messagebox.showinfo("Success", "CSV file saved successfully!")
+                    stream_json_to_csv(self.json_path, save_path)
+                    messagebox.showinfo("Success", "CSV file saved successfully!")
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save CSV file: {e}")
 
+def run_headless(args):
+    columns = load_schema(args.schema) if args.schema else None
+    columns, count = stream_json_to_csv(args.json_file, args.csv_file, columns, args.sep)
+    if args.save_schema:
+        save_schema(columns, args.save_schema)
+    print(f"Wrote {count} records with {len(columns)} columns to {args.csv_file}")
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = JsonToCsvConverter(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Convert a JSON array or NDJSON file to CSV. Starts the GUI when no files are given.")
+    parser.add_argument("json_file", nargs="?", help="Path to the JSON or NDJSON file.")
+    parser.add_argument("csv_file", nargs="?", help="Path to save the CSV file.")
+    parser.add_argument("--schema", help="Reuse the columns saved by --save-schema and skip the discovery pass.")
+    parser.add_argument("--save-schema", help="Save the discovered columns to this file.")
+    parser.add_argument("--sep", default=".", help="Separator for flattened nested keys (default: '.').")
+    args = parser.parse_args()
+
+    if args.json_file and args.csv_file:
+        run_headless(args)
+    else:
+        root = tk.Tk()
+        app = JsonToCsvConverter(root)
+        root.mainloop()
@@ -1,7 +1,87 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import json
+import argparse
+import os
+import sys
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from json_stream import count_json_records, iter_json_events, iter_json_records
+from paged_preview import PagedPreview
+
+# Output buffer size for the streaming writer
+WRITE_BUFFER_SIZE = 1 << 20
+
+def write_json_events(out, events, root_tag="root", records=False):
+    """Serialize a stream of json_stream parse events as XML straight to ``out``.
+
+    Uses the same mapping as ``JsonToXmlConverter.dict_to_element`` (object keys
+    become elements, list items become ``<key_0>``, ``<key_1>``, ...), but keeps
+    only the chain of open elements on an explicit stack, so memory does not
+    grow with the document and nesting depth is not bound by the recursion
+    limit. Unlike the tree path, scalar list items keep their text. With
+    ``records`` every top-level value becomes ``<root_N>`` inside ``<root>``.
+    Returns the number of top-level values written.
+    """
+    # Open elements as [tag, is_array, next_item_index]
+    stack = [[root_tag, True, 0]] if records else []
+    if records:
+        out.write(f"<{root_tag}>")
+    top_depth = 1 if records else 0
+    key = None
+    count = 0
+    # An element whose start tag awaits ">" or " />" until its first child or its end
+    pending = False
+    for event, value in events:
+        if event == "key":
+            key = value
+            continue
+        if event in ("end_map", "end_array"):
+            tag = stack.pop()[0]
+            out.write(" />" if pending else f"</{tag}>")
+            pending = False
+            continue
+
+        if pending:
+            out.write(">")
+            pending = False
+        if stack and stack[-1][1]:
+            tag = f"{stack[-1][0]}_{stack[-1][2]}"
+            stack[-1][2] += 1
+        elif stack:
+            tag = key
+        else:
+            if count:
+                raise ValueError("Unexpected data after the JSON document")
+            tag = root_tag
+        if len(stack) == top_depth:
+            count += 1
+
+        if event == "value":
+            text = escape(str(value))
+            out.write(f"<{tag}>{text}</{tag}>" if text else f"<{tag} />")
+        else:
+            out.write(f"<{tag}")
+            pending = True
+            stack.append([tag, event == "start_array", 0])
+    if records:
+        out.write(f"</{root_tag}>")
+    return count
+
+def stream_json_to_xml(json_file_path, xml_file_path, root_tag="root", ndjson=None):
+    """Convert a JSON or NDJSON file to XML with memory independent of its size.
+
+    A JSON document becomes ``<root>``; each record of an NDJSON file becomes
+    ``<root_0>``, ``<root_1>``, ... inside it. ``ndjson`` defaults to True for
+    ``.ndjson`` and ``.jsonl`` files. Returns the number of records written.
+    """
+    if ndjson is None:
+        ndjson = json_file_path.lower().endswith((".ndjson", ".jsonl"))
+    with open(json_file_path, "r", encoding="utf-8") as json_file, \
+            open(xml_file_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as out:
+        out.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        return write_json_events(out, iter_json_events(json_file), root_tag, records=ndjson)
 
 class JsonToXmlConverter:
     def __init__(self, root):
@@ -24,7 +104,7 @@ class JsonToXmlConverter:
         self.progress = ttk.Progressbar(root, orient=tk.HORIZONTAL, length=400, mode='determinate')
         self.progress.pack(pady=20)
 
-        self.json_data = None
+        self.json_path = None
 
     def open_json(self):
         file_path = filedialog.askopenfilename(
@@ -32,8 +112,9 @@ class JsonToXmlConverter:
         )
         if file_path:
             try:
-                with open(file_path, "r") as file:
-                    self.json_data = json.load(file)
+                # Parse only the first record to validate the file; conversion streams it
+                next(iter_json_records(file_path), None)
+                self.json_path = file_path
                 messagebox.showinfo("Success", "JSON file loaded successfully!")
                 self.preview_button.config(state=tk.NORMAL)
                 self.convert_button.config(state=tk.NORMAL)
@@ -41,7 +122,10 @@ class JsonToXmlConverter:
                 messagebox.showerror("Error", f"Failed to load JSON file: {e}")
 
     def dict_to_element(self, tag, d):
-        """Convert a dictionary to an XML Element."""
+        """Convert a dictionary to an XML Element.
+
+        Builds the whole tree in memory; conversions go through write_json_events.
+        """
         elem = ET.Element(tag)
         if isinstance(d, dict):
             for key, val in d.items():
@@ -61,18 +145,12 @@ class JsonToXmlConverter:
         return elem
 
     def preview_json(self):
-        if self.json_data:
-            preview_window = tk.Toplevel(self.root)
-            preview_window.title("JSON Data Preview")
-            preview_window.geometry("500x300")
-            
-            text_area = tk.Text(preview_window, wrap=tk.WORD)
-            text_area.pack(expand=True, fill=tk.BOTH)
-            text_area.insert(tk.END, json.dumps(self.json_data, indent=4))
-            text_area.config(state=tk.DISABLED)
+        if self.json_path:
+            json_path = self.json_path
+            PagedPreview(self.root, "JSON Data Preview", lambda: iter_json_records(json_path), lambda: count_json_records(json_path))
 
     def convert_to_xml(self):
-        if self.json_data:
+        if self.json_path:
             save_path = filedialog.asksaveasfilename(
                 defaultextension=".xml",
                 filetypes=[("XML Files", "*.xml"), ("All Files", "*.*")]
@@ -82,10 +160,8 @@ class JsonToXmlConverter:
                     self.progress['value'] = 0
                     self.root.update_idletasks()
 
-                    root_element = self.dict_to_element('root', self.json_data)
-                    tree = ET.ElementTree(root_element)
-                    tree.write(save_path, encoding='utf-8', xml_declaration=True)
-                    
+                    stream_json_to_xml(self.json_path, save_path)
+
                     self.progress['value'] = 100
                     self.root.update_idletasks()
                     messagebox.showinfo("Success", "XML file saved successfully!")
@@ -93,6 +169,17 @@ class JsonToXmlConverter:
                     messagebox.showerror("Error", f"Failed to save XML file: {e}")
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = JsonToXmlConverter(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Convert a JSON or NDJSON file to XML. Starts the GUI when no files are given.")
+    parser.add_argument("json_file", nargs="?", help="Path to the JSON or NDJSON file.")
+    parser.add_argument("xml_file", nargs="?", help="Path to save the XML file.")
+    parser.add_argument("--root-tag", default="root", help="Name of the root element (default: root).")
+    parser.add_argument("--ndjson", action="store_true", default=None, help="Treat the input as JSON Lines (default for .ndjson/.jsonl files).")
+    args = parser.parse_args()
+
+    if args.json_file and args.xml_file:
+        count = stream_json_to_xml(args.json_file, args.xml_file, args.root_tag, args.ndjson)
+        print(f"Wrote {count} records to {args.xml_file}")
+    else:
+        root = tk.Tk()
+        app = JsonToXmlConverter(root)
+        root.mainloop()
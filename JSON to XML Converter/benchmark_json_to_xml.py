@@ -0,0 +1,95 @@
+"""Benchmark the streaming JSON to XML writer against the element-tree path.
+
+Generates a JSON document of roughly --size-mb megabytes, converts it in a
+fresh process with each engine and reports time, throughput and peak RSS,
+then checks that both outputs are identical.
+
+    python benchmark_json_to_xml.py [--size-mb 100]
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from JSON_to_XML_Converter import JsonToXmlConverter, stream_json_to_xml
+
+def build_document(path, size_mb):
+    # Records hold only objects inside lists, where both engines produce the same XML
+    target = size_mb * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('{"orders": [')
+        i = 0
+        while out.tell() < target:
+            record = {
+                "id": i,
+                "customer": {"name": f"Customer {i}", "email": f"c{i}@example.com", "vip": i % 7 == 0},
+                "lines": [{"sku": f"SKU-{i}-{n}", "qty": n, "price": n * 2.5} for n in range(3)],
+                "note": "Fragile & <handle> with care" if i % 5 == 0 else "",
+            }
+            out.write(("," if i else "") + json.dumps(record))
+            i += 1
+        out.write("]}")
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_engine(engine, json_path, xml_path, results):
+    start = time.perf_counter()
+    if engine == "tree":
+        with open(json_path, "r", encoding="utf-8") as json_file:
+            data = json.load(json_file)
+        converter = JsonToXmlConverter.__new__(JsonToXmlConverter)
+        ET.ElementTree(converter.dict_to_element("root", data)).write(xml_path, encoding="utf-8", xml_declaration=True)
+    else:
+        stream_json_to_xml(json_path, xml_path)
+    results.put((time.perf_counter() - start, peak_rss_mb()))
+
+def measure(engine, json_path, xml_path):
+    # A fresh process per run keeps peak RSS figures independent of each other
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_engine, args=(engine, json_path, xml_path, results))
+    process.start()
+    elapsed, peak = results.get()
+    process.join()
+    return elapsed, peak
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON to XML conversion engines.")
+    parser.add_argument("--size-mb", type=int, default=100, help="Approximate size of the generated JSON input.")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "json_to_xml_bench"), help="Directory for generated files.")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    json_path = os.path.join(args.workdir, f"bench_{args.size_mb}mb.json")
+    if not os.path.exists(json_path):
+        print(f"Generating {json_path}...", file=sys.stderr)
+        build_document(json_path, args.size_mb)
+    input_mb = os.path.getsize(json_path) / (1024 * 1024)
+
+    print(f"{'engine':<8} {'seconds':>9} {'MB/s':>8} {'peak RSS (MB)':>14}")
+    digests = {}
+    for engine in ("tree", "stream"):
+        xml_path = os.path.join(args.workdir, f"bench_{engine}.xml")
+        elapsed, peak = measure(engine, json_path, xml_path)
+        digests[engine] = file_digest(xml_path)
+        print(f"{engine:<8} {elapsed:>9.2f} {input_mb / elapsed:>8.1f} {peak:>14.1f}")
+    print("Outputs identical" if digests["tree"] == digests["stream"] else "Outputs DIFFER")
+
+if __name__ == "__main__":
+    main()
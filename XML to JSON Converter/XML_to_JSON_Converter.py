@@ -1,7 +1,130 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import xml.etree.ElementTree as ET
-import json
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json_codec
+from paged_preview import PagedPreview
+
+def element_value(elem, attrib, children):
+    """Build the JSON value of a closed element.
+
+    A plain element with no attributes or children becomes its text. Otherwise
+    the value is a dict of ``@attribute`` keys, child tags (repeated tags become
+    lists) and ``#text`` for non-blank text.
+    """
+    if not attrib and not children:
+        return elem.text
+    value = {f"@{name}": attr for name, attr in attrib.items()}
+    value.update(children)
+    text = elem.text.strip() if elem.text else ""
+    if text:
+        value["#text"] = text
+    return value
+
+def add_child(children, tag, value):
+    if tag not in children:
+        children[tag] = value
+    elif isinstance(children[tag], list):
+        children[tag].append(value)
+    else:
+        # Element values are never lists, so a list always means repeated tags
+        children[tag] = [children[tag], value]
+
+def parse_record_path(record_path):
+    """Split ``/catalog/book`` into its tags; ``*`` matches any tag."""
+    return [part for part in record_path.strip("/").split("/") if part]
+
+def matches_record_path(elements, record_tags):
+    return len(elements) == len(record_tags) and all(
+        tag in ("*", elem.tag) for tag, elem in zip(record_tags, elements)
+    )
+
+def iter_xml_records(xml_file_path, record_path=None):
+    """Stream ``(tag, value)`` pairs from an XML file with ``ET.iterparse``.
+
+    With a ``record_path`` every element at that path is yielded as soon as it
+    closes; without one a single pair is yielded for the root element. Values
+    are built iteratively from start/end events instead of recursing, and each
+    element is detached from its parent once converted, so memory is bounded by
+    the largest record rather than the document.
+    """
+    record_tags = parse_record_path(record_path) if record_path else None
+    elements = []   # open elements, root first
+    frames = []     # (attrib, children) for open elements whose value is being built
+    for event, elem in ET.iterparse(xml_file_path, events=("start", "end")):
+        if event == "start":
+            elements.append(elem)
+            # Every element inside a record is built; otherwise only record starts
+            if frames or record_tags is None or matches_record_path(elements, record_tags):
+                frames.append((dict(elem.attrib), {}))
+            continue
+
+        elements.pop()
+        if frames:
+            attrib, children = frames.pop()
+            value = element_value(elem, attrib, children)
+            if frames:
+                add_child(frames[-1][1], elem.tag, value)
+            else:
+                yield elem.tag, value
+        if elements:
+            elements[-1].remove(elem)
+        elem.clear()
+
+def stream_xml_to_json(xml_file_path, json_file_path, record_path=None, output_format="array", indent=4, sort_keys=False, ensure_ascii=True):
+    """Convert an XML file to JSON.
+
+    Without ``record_path`` the whole document is written as ``{root: value}``.
+    With one, each matching element's value is written as it closes, either as
+    NDJSON (one compact object per line) or as an incrementally written array.
+    ``indent``, ``sort_keys`` and ``ensure_ascii`` behave as in ``json.dumps``.
+    Returns the number of records written.
+    """
+    records = iter_xml_records(xml_file_path, record_path)
+    count = 0
+    with open(json_file_path, "w") as json_file:
+        if record_path is None:
+            for tag, value in records:
+                json_codec.dump({tag: value}, json_file, indent, sort_keys, ensure_ascii)
+                count += 1
+        elif output_format == "ndjson":
+            for _, value in records:
+                json_file.write(json_codec.dumps(value, None, sort_keys, ensure_ascii))
+                json_file.write("\n")
+                count += 1
+        else:
+            for _, value in records:
+                json_file.write(",\n" if count else "[\n")
+                json_file.write(json_codec.dumps(value, indent, sort_keys, ensure_ascii, level=1))
+                count += 1
+            json_file.write("\n]" if count else "[]")
+    return count
+
+def iter_xml_children(xml_file_path):
+    """Lazily yield ``{tag: value}`` for each child of the root element."""
+    for tag, value in iter_xml_records(xml_file_path, "/*/*"):
+        yield {tag: value}
+
+def count_xml_children(xml_file_path):
+    """Count the children of the root element in one streaming pass."""
+    count = 0
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(xml_file_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            count += 1
+            root.clear()
+    return count
 
 class XmlToJsonConverter:
     def __init__(self, root):
@@ -21,10 +144,15 @@ class XmlToJsonConverter:
         self.convert_button = tk.Button(root, text="Convert to JSON", command=self.convert_to_json, state=tk.DISABLED)
         self.convert_button.pack(pady=5)
 
+        self.record_path_label = tk.Label(root, text="Record path (optional, e.g. /catalog/book):")
+        self.record_path_label.pack()
+        self.record_path_entry = tk.Entry(root, width=40)
+        self.record_path_entry.pack(pady=5)
+
         self.progress = ttk.Progressbar(root, orient=tk.HORIZONTAL, length=400, mode='determinate')
         self.progress.pack(pady=20)
 
-        self.xml_data = None
+        self.xml_path = None
 
     def open_xml(self):
         file_path = filedialog.askopenfilename(
@@ -32,40 +160,22 @@ class XmlToJsonConverter:
         )
         if file_path:
             try:
-                tree = ET.parse(file_path)
-                self.xml_data = self.element_to_dict(tree.getroot())
+                # Only the root start tag is parsed here; conversion streams the file
+                next(ET.iterparse(file_path, events=("start",)))
+                self.xml_path = file_path
                 messagebox.showinfo("Success", "XML file loaded successfully!")
                 self.preview_button.config(state=tk.NORMAL)
                 self.convert_button.config(state=tk.NORMAL)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load XML file: {e}")
 
-    def element_to_dict(self, element):
-        """Convert an XML element to a dictionary."""
-        def parse_element(el):
-            d = {}
-            for child in el:
-                if len(child) > 0:
-                    d[child.tag] = parse_element(child)
-                else:
-                    d[child.tag] = child.text
-            return d
-
-        return {element.tag: parse_element(element)}
-
     def preview_xml(self):
-        if self.xml_data:
-            preview_window = tk.Toplevel(self.root)
-            preview_window.title("XML Data Preview")
-            preview_window.geometry("500x300")
-            
-            text_area = tk.Text(preview_window, wrap=tk.WORD)
-            text_area.pack(expand=True, fill=tk.BOTH)
-            text_area.insert(tk.END, json.dumps(self.xml_data, indent=4))
-            text_area.config(state=tk.DISABLED)
+        if self.xml_path:
+            xml_path = self.xml_path
+            PagedPreview(self.root, "XML Data Preview", lambda: iter_xml_children(xml_path), lambda: count_xml_children(xml_path))
 
     def convert_to_json(self):
-        if self.xml_data:
+        if self.xml_path:
             save_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
                 filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
@@ -75,15 +185,30 @@ class XmlToJsonConverter:
                     self.progress['value'] = 0
                     self.root.update_idletasks()
 
-                    with open(save_path, "w") as json_file:
-                        json.dump(self.xml_data, json_file, indent=4)
-                        self.progress['value'] = 100
-                        self.root.update_idletasks()
-                        messagebox.showinfo("Success", "JSON file saved successfully!")
+                    record_path = self.record_path_entry.get().strip() or None
+                    stream_xml_to_json(self.xml_path, save_path, record_path)
+                    self.progress['value'] = 100
+                    self.root.update_idletasks()
+                    messagebox.showinfo("Success", "JSON file saved successfully!")
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save JSON file: {e}")
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = XmlToJsonConverter(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Convert an XML file to JSON. Starts the GUI when no files are given.")
+    parser.add_argument("xml_file", nargs="?", help="Path to the XML file.")
+    parser.add_argument("json_file", nargs="?", help="Path to save the JSON file.")
+    parser.add_argument("--record-path", help="Emit one record per element at this path, e.g. /catalog/book ('*' matches any tag).")
+    parser.add_argument("--format", choices=["ndjson", "array"], default="ndjson", help="Output for --record-path records (default: ndjson).")
+    parser.add_argument("--indent", type=int, default=4, help="Indentation for document and array output (default: 4).")
+    parser.add_argument("--sort-keys", action="store_true", help="Write object keys in sorted order.")
+    parser.add_argument("--unicode", action="store_true", help="Write non-ASCII characters as-is instead of \\u escapes.")
+    args = parser.parse_args()
+
+    if args.xml_file and args.json_file:
+        count = stream_xml_to_json(args.xml_file, args.json_file, args.record_path, args.format,
+                                   args.indent, args.sort_keys, not args.unicode)
+        print(f"Wrote {count} records to {args.json_file}")
+    else:
+        root = tk.Tk()
+        app = XmlToJsonConverter(root)
+        root.mainloop()
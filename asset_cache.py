@@ -0,0 +1,340 @@
+"""Local cache of the stylesheets, fonts and images that HTML documents link to.
+
+Before a document is rendered, its asset references (stylesheet and icon
+links, img/script/source/embed sources, url() and @import in style blocks,
+style attributes and the stylesheets themselves) are rewritten to file:// URLs
+of cached copies, so the renderer never downloads or resolves the same asset
+twice. Copies are named after the SHA-256 of their content: a CSS bundle
+linked by thousands of documents, or from several URLs, is stored once.
+Stylesheets are stored with their own references already rewritten.
+
+The cache is bounded by total size; past ``max_bytes`` the least recently used
+copies are deleted, except those linked since the last save(), which the
+documents being rendered still need. Remote assets are fetched again after
+``max_age`` seconds, local files as soon as their size or modification time
+changes.
+
+Only asset references are rewritten; the copy of a document is meant to be
+rendered from the original's location, where everything else still resolves.
+"""
+import hashlib
+import html
+import json
+import mimetypes
+import os
+import pathlib
+import re
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                                 "python-convertors", "assets")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Seconds before a remote asset is fetched again
+REMOTE_MAX_AGE = 24 * 60 * 60
+FETCH_TIMEOUT = 30
+USER_AGENT = "python-convertors asset cache"
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+# The markup of a document: comments, script and style elements (whose
+# content is not markup) and start tags. Text between them is never touched.
+_MARKUP = re.compile(r"""<!--.*?-->"""
+                     r"""|(<(script|style)\b(?:"[^"]*"|'[^']*'|[^'">])*>)(.*?)(</\2\s*>)"""
+                     r"""|<([A-Za-z][A-Za-z0-9-]*)\b(?:"[^"]*"|'[^']*'|[^'">])*>""", re.I | re.S)
+# Tags whose src/href/poster is an asset the renderer would load
+ASSET_TAGS = frozenset(("link", "img", "script", "source", "input", "embed", "video", "audio", "track"))
+_ASSET_ATTRIBUTE = re.compile(r"""(\s(?:src|href|poster)\s*=\s*)(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.I)
+_LINK_REL = re.compile(r"""\srel\s*=\s*["']?[^"'>]*\b(?:stylesheet|icon)\b""", re.I)
+_BASE_HREF = re.compile(r"""\shref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.I)
+_STYLE_ATTRIBUTE = re.compile(r"""(\sstyle\s*=\s*)(?:"([^"]*)"|'([^']*)')""", re.I)
+_CSS_URL = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)\s"']*))\s*\)""", re.I)
+_CSS_IMPORT = re.compile(r"""(@import\s+)(?:"([^"]*)"|'([^']*)')""", re.I)
+# References that name no file to fetch
+_NOT_FETCHED = ("data:", "about:", "javascript:", "mailto:", "tel:", "#")
+
+
+def file_url(path):
+    return pathlib.Path(os.path.abspath(path)).as_uri()
+
+
+def _extension(url, content_type):
+    extension = os.path.splitext(urlsplit(url).path)[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,8}", extension):
+        extension = mimetypes.guess_extension(content_type or "") or ""
+    return extension
+
+
+class AssetCache(object):
+    """Content-addressed copies of linked assets under ``directory``.
+
+    rewrite_html() and rewrite_css() return the text with every asset they
+    could fetch replaced by its cached copy; anything that cannot be fetched
+    is left as it was. ``hits``, ``misses``, ``errors`` and ``evictions``
+    count lookups since the cache was opened. Call save() once the rewritten
+    documents are rendered: it writes the index and unpins their assets.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, max_age=REMOTE_MAX_AGE):
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.evictions = 0
+        # url -> {"blob", "fetched", "stamp", "deps"}
+        self.urls = {}
+        # blob name -> size, least recently used first
+        self.blobs = OrderedDict()
+        self.total_bytes = 0
+        # Blobs linked since the last save, never evicted
+        self.pinned = set()
+        self.lock = threading.RLock()
+        os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+        self._load_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def _blob_path(self, name):
+        return os.path.join(self.directory, "objects", name[:2], name)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != INDEX_VERSION:
+                raise ValueError("index version changed")
+            self.urls = index["urls"]
+            self.blobs = OrderedDict((name, size) for name, size in index["blobs"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # No usable index: count the copies already on disk so the size
+            # bound still holds, oldest first
+            self.urls = {}
+            found = []
+            for dirpath, _, filenames in os.walk(os.path.join(self.directory, "objects")):
+                for name in filenames:
+                    if not name.startswith("."):
+                        stat = os.stat(os.path.join(dirpath, name))
+                        found.append((stat.st_mtime, name, stat.st_size))
+            self.blobs = OrderedDict((name, size) for _, name, size in sorted(found))
+        self.total_bytes = sum(self.blobs.values())
+
+    def save(self):
+        """Write the index, so the next run finds the cached copies."""
+        with self.lock:
+            self._evict()
+            self.pinned.clear()
+            index = {"version": INDEX_VERSION, "urls": self.urls, "blobs": list(self.blobs.items())}
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".index-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(temp_path, self._index_path())
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "evictions": self.evictions,
+                "files": len(self.blobs), "bytes": self.total_bytes}
+
+    def _touch(self, name):
+        self.blobs.move_to_end(name)
+        self.pinned.add(name)
+
+    def _lookup(self, url):
+        # The cached blob for url if it is still fresh and every copy it
+        # links to is still on disk
+        entry = self.urls.get(url)
+        if entry is None:
+            return None
+        if entry["stamp"] is not None:
+            try:
+                stat = os.stat(urllib.request.url2pathname(urlsplit(url).path))
+            except OSError:
+                return None
+            if [stat.st_size, stat.st_mtime_ns] != entry["stamp"]:
+                return None
+        elif time.time() - entry["fetched"] > self.max_age:
+            return None
+        names = [entry["blob"]] + entry["deps"]
+        if not all(name in self.blobs and os.path.exists(self._blob_path(name)) for name in names):
+            return None
+        for name in names:
+            self._touch(name)
+        return entry["blob"]
+
+    def _store(self, name, data):
+        path = self._blob_path(name)
+        if name not in self.blobs or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            if name not in self.blobs:
+                self.blobs[name] = len(data)
+                self.total_bytes += len(data)
+        self._touch(name)
+        self._evict()
+
+    def _evict(self):
+        # Pinned blobs were touched last, so they sit at the end
+        while self.total_bytes > self.max_bytes and self.blobs and next(iter(self.blobs)) not in self.pinned:
+            name, size = self.blobs.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._blob_path(name))
+            except OSError:
+                pass
+
+    def _fetch(self, url, importing):
+        scheme = urlsplit(url).scheme.lower()
+        try:
+            if scheme in ("http", "https"):
+                request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+                with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                    data = response.read()
+                    content_type = response.headers.get_content_type()
+                stamp = None
+            elif scheme == "file":
+                path = urllib.request.url2pathname(urlsplit(url).path)
+                stat = os.stat(path)
+                with open(path, "rb") as f:
+                    data = f.read()
+                content_type = mimetypes.guess_type(path)[0]
+                stamp = [stat.st_size, stat.st_mtime_ns]
+            else:
+                return None
+        except (OSError, ValueError):
+            # urllib's errors are OSErrors too
+            return None
+
+        self.misses += 1
+        extension = _extension(url, content_type)
+        deps = []
+        if extension == ".css" or content_type == "text/css":
+            css = self._rewrite_css(data.decode("utf-8", "surrogateescape"), url, importing + (url,), deps)
+            data = css.encode("utf-8", "surrogateescape")
+        name = hashlib.sha256(data).hexdigest() + extension
+        self._store(name, data)
+        self.urls[url] = {"blob": name, "fetched": time.time(), "stamp": stamp, "deps": deps}
+        return name
+
+    def _resolve(self, url, importing, deps):
+        # file:// URL of the cached copy of url, or None
+        url, _, fragment = url.partition("#")
+        if url in importing:
+            # @import cycle
+            return None
+        with self.lock:
+            name = self._lookup(url)
+            if name is not None:
+                self.hits += 1
+            else:
+                name = self._fetch(url, importing)
+                if name is None:
+                    stale = self.urls.get(url)
+                    if stale is not None and os.path.exists(self._blob_path(stale["blob"])):
+                        # Offline or failing: an outdated copy beats none
+                        name = stale["blob"]
+                    self.errors += 1
+            if name is None:
+                return None
+            deps.append(name)
+            deps.extend(self.urls[url]["deps"] if url in self.urls else [])
+        return file_url(self._blob_path(name)) + ("#" + fragment if fragment else "")
+
+    def _rewrite_url(self, reference, base_url, importing, deps):
+        reference = reference.strip()
+        if not reference or reference.lower().startswith(_NOT_FETCHED):
+            return None
+        url = urljoin(base_url or "", reference)
+        if not urlsplit(url).scheme:
+            # Relative, with nothing to resolve it against
+            return None
+        return self._resolve(url, importing, deps)
+
+    def _rewrite_css(self, css, base_url, importing, deps):
+        def replace_url(match):
+            reference = next(group for group in match.groups() if group is not None)
+            cached = self._rewrite_url(reference, base_url, importing, deps)
+            return f'url("{cached}")' if cached else match.group(0)
+
+        def replace_import(match):
+            reference = match.group(2) if match.group(2) is not None else match.group(3)
+            cached = self._rewrite_url(reference, base_url, importing, deps)
+            return f'{match.group(1)}"{cached}"' if cached else match.group(0)
+
+        return _CSS_IMPORT.sub(replace_import, _CSS_URL.sub(replace_url, css))
+
+    def rewrite_css(self, css, base_url=None):
+        """Return ``css`` with url() and @import references pointing at cached copies."""
+        return self._rewrite_css(css, base_url, (), [])
+
+    def rewrite_html(self, text, base_url=None):
+        """Return ``text`` with its assets pointing at cached copies.
+
+        Relative references are resolved against the document's <base href>,
+        else ``base_url`` (the document's own URL); without either only
+        absolute URLs are cached. Only start tags, style elements and style
+        attributes are rewritten, never text or script content.
+        """
+        for match in _MARKUP.finditer(text):
+            if (match.group(5) or "").lower() == "base":
+                href = _BASE_HREF.search(match.group(0))
+                if href:
+                    base_url = urljoin(base_url or "", html.unescape(next(group for group in href.groups() if group is not None)))
+                break
+        deps = []
+
+        def rewrite_url(value):
+            return self._rewrite_url(value, base_url, (), deps)
+
+        def replace_asset_attribute(match):
+            value = next(group for group in match.groups()[1:] if group is not None)
+            rewritten = rewrite_url(html.unescape(value))
+            return f'{match.group(1)}"{html.escape(rewritten)}"' if rewritten else match.group(0)
+
+        def replace_style_attribute(match):
+            value = match.group(2) if match.group(2) is not None else match.group(3)
+            css = self._rewrite_css(html.unescape(value), base_url, (), deps)
+            return f'{match.group(1)}"{html.escape(css)}"'
+
+        def rewrite_tag(tag, name):
+            if name in ASSET_TAGS and (name != "link" or _LINK_REL.search(tag)):
+                tag = _ASSET_ATTRIBUTE.sub(replace_asset_attribute, tag)
+            return _STYLE_ATTRIBUTE.sub(replace_style_attribute, tag)
+
+        def replace_markup(match):
+            if match.group(1):
+                # <script> or <style>: only a stylesheet's content is rewritten
+                name = match.group(2).lower()
+                content = self._rewrite_css(match.group(3), base_url, (), deps) if name == "style" else match.group(3)
+                return rewrite_tag(match.group(1), name) + content + match.group(4)
+            if match.group(5):
+                return rewrite_tag(match.group(0), match.group(5).lower())
+            return match.group(0)
+
+        return _MARKUP.sub(replace_markup, text)
+
+
+def format_asset_summary(stats):
+    lookups = stats["hits"] + stats["misses"]
+    rate = 100.0 * stats["hits"] / lookups if lookups else 0.0
+    line = (f"Asset cache: {stats['hits']} hits, {stats['misses']} misses ({rate:.1f}% hit rate), "
+            f"{stats['files']} files, {stats['bytes'] / (1024 * 1024):.1f} MB")
+    if stats["evictions"]:
+        line += f", {stats['evictions']} evicted"
+    if stats["errors"]:
+        line += f", {stats['errors']} could not be fetched"
+    return line
@@ -1,21 +1,210 @@
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from ttkthemes import ThemedTk
 from tkinter import ttk
+import argparse
+import os
+import sys
+import time
+import warnings
+from pandas.tseries.api import guess_datetime_format
+
+# Excel's hard limit on rows per worksheet, header row included
+EXCEL_MAX_ROWS = 1048576
+# Number of CSV rows parsed by pandas per chunk
+DEFAULT_CHUNK_SIZE = 50000
+# Rows sampled to infer column dtypes, and the unique-value ratio below which
+# a string column is read as a categorical
+DEFAULT_SAMPLE_ROWS = 10000
+DEFAULT_CATEGORY_THRESHOLD = 0.5
+
+def infer_dtypes(csv_file_path, sample_rows=DEFAULT_SAMPLE_ROWS, usecols=None, category_threshold=DEFAULT_CATEGORY_THRESHOLD, **read_csv_kwargs):
+    """Infer compact column types from the first ``sample_rows`` rows of a CSV.
+
+    Returns ``(plan, sample_report)``. ``plan`` holds the ``dtype`` mapping
+    (categoricals for low-cardinality strings), ``parse_dates`` list and
+    ``date_format`` mapping to pass to ``pd.read_csv``, plus the
+    ``downcast_ints`` columns to shrink after parsing. A column only counts as
+    dates when one format, guessed from its first value, parses every value.
+    Integers are downcast per chunk rather than through ``dtype=`` because
+    read_csv silently wraps values that overflow a dtype chosen from the sample.
+    ``sample_report`` compares the sample's memory with default and inferred types.
+    """
+    sample = pd.read_csv(csv_file_path, nrows=sample_rows, usecols=usecols, **read_csv_kwargs)
+    typed = sample.copy()
+    plan = {"dtype": {}, "parse_dates": [], "date_format": {}, "downcast_ints": []}
+
+    for column in sample.columns:
+        series = sample[column]
+        if pd.api.types.is_integer_dtype(series):
+            plan["downcast_ints"].append(column)
+            typed[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            non_null = series.dropna()
+            if non_null.empty:
+                continue
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                date_format = guess_datetime_format(str(non_null.iloc[0]))
+                parsed = pd.to_datetime(non_null, format=date_format, errors="coerce") if date_format else None
+            if parsed is not None and parsed.notna().all():
+                plan["parse_dates"].append(column)
+                plan["date_format"][column] = date_format
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)
+                    typed[column] = pd.to_datetime(series, format=date_format, errors="coerce")
+            elif non_null.nunique() <= category_threshold * len(non_null):
+                plan["dtype"][column] = "category"
+                typed[column] = series.astype("category")
+
+    sample_report = {
+        "sample_rows": len(sample),
+        "default_bytes": int(sample.memory_usage(deep=True).sum()),
+        "typed_bytes": int(typed.memory_usage(deep=True).sum()),
+    }
+    return plan, sample_report
+
+def convert_with_inferred_dtypes(csv_file_path, excel_file_path, sample_rows=DEFAULT_SAMPLE_ROWS, usecols=None, category_threshold=DEFAULT_CATEGORY_THRESHOLD, chunksize=DEFAULT_CHUNK_SIZE, progress_callback=None, **read_csv_kwargs):
+    """Two-phase conversion: infer dtypes from a sample, then stream the full file with them.
+
+    ``usecols`` optionally restricts the conversion to a subset of columns.
+    Returns a report with the time spent per phase and the memory saved.
+    """
+    start = time.perf_counter()
+    plan, sample_report = infer_dtypes(csv_file_path, sample_rows, usecols, category_threshold, **read_csv_kwargs)
+    infer_seconds = time.perf_counter() - start
+
+    stats = {}
+    rows = stream_csv_to_excel(
+        csv_file_path, excel_file_path, chunksize, progress_callback,
+        downcast_ints=plan["downcast_ints"], stats=stats,
+        dtype=plan["dtype"], parse_dates=plan["parse_dates"], date_format=plan["date_format"], usecols=usecols, **read_csv_kwargs,
+    )
+
+    default_bytes = sample_report["default_bytes"]
+    typed_bytes = sample_report["typed_bytes"]
+    saved_ratio = 1 - typed_bytes / default_bytes if default_bytes else 0.0
+    return {
+        "rows": rows,
+        "plan": plan,
+        "phases": {"infer": infer_seconds, "read": stats["read_seconds"], "write": stats["write_seconds"]},
+        "sample": sample_report,
+        "saved_ratio": saved_ratio,
+        "typed_bytes": stats["memory_bytes"],
+        # Extrapolated from the sample; the untyped file is never loaded
+        "estimated_default_bytes": int(stats["memory_bytes"] / (1 - saved_ratio)) if saved_ratio < 1 else None,
+    }
+
+def format_dtype_report(report):
+    """Render a convert_with_inferred_dtypes report as text."""
+    mb = 1024 * 1024
+    plan = report["plan"]
+    sample = report["sample"]
+    lines = [
+        f"Categorical columns: {', '.join(map(str, plan['dtype'])) or '-'}",
+        f"Date columns: {', '.join(map(str, plan['parse_dates'])) or '-'}",
+        f"Downcast integer columns: {', '.join(map(str, plan['downcast_ints'])) or '-'}",
+        "Phase timings:",
+    ]
+    lines += [f"  {phase:<6} {seconds:8.2f}s" for phase, seconds in report["phases"].items()]
+    lines.append(f"Sample ({sample['sample_rows']} rows): {sample['default_bytes'] / mb:.2f} MB default -> "
+                 f"{sample['typed_bytes'] / mb:.2f} MB typed ({report['saved_ratio']:.0%} saved)")
+    full = f"Full file ({report['rows']} rows): {report['typed_bytes'] / mb:.2f} MB typed"
+    if report["estimated_default_bytes"]:
+        full += f", ~{report['estimated_default_bytes'] / mb:.2f} MB estimated with default dtypes"
+    lines.append(full)
+    return "\n".join(lines)
+
+def header_cells(worksheet, columns):
+    """Build header cells styled like the ones written by DataFrame.to_excel."""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    thin = Side(style="thin")
+    cells = []
+    for column in columns:
+        cell = WriteOnlyCell(worksheet, value=str(column))
+        cell.font = Font(bold=True)
+        cell.border = Border(top=thin, right=thin, bottom=thin, left=thin)
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        cells.append(cell)
+    return cells
+
+def stream_csv_to_excel(csv_file_path, excel_file_path, chunksize=DEFAULT_CHUNK_SIZE, progress_callback=None, downcast_ints=None, stats=None, **read_csv_kwargs):
+    """Convert a CSV file to .xlsx without holding the whole file in memory.
+
+    The CSV is read in chunks of ``chunksize`` rows and appended to a write-only
+    openpyxl workbook, which streams rows to disk as they are added. When a sheet
+    reaches Excel's row limit the remaining rows roll over to Sheet2, Sheet3, ...
+    each with its own header row. ``progress_callback(bytes_read, total_bytes)``
+    is called after every chunk. ``downcast_ints`` lists integer columns shrunk to
+    the smallest dtype that fits each chunk. When a ``stats`` dict is given it is
+    filled with ``read_seconds``, ``write_seconds`` and the summed chunk
+    ``memory_bytes``. Extra keyword arguments go to ``pd.read_csv``.
+    Returns the number of data rows written.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    total_bytes = os.path.getsize(csv_file_path)
+    worksheet = None
+    header = None
+    rows_in_sheet = 0
+    rows_written = 0
+    read_seconds = write_seconds = 0.0
+    memory_bytes = 0
+
+    with open(csv_file_path, "rb") as csv_file:
+        reader = pd.read_csv(csv_file, chunksize=chunksize, **read_csv_kwargs)
+        while True:
+            start = time.perf_counter()
+            chunk = next(reader, None)
+            if chunk is None:
+                break
+            for column in downcast_ints or ():
+                chunk[column] = pd.to_numeric(chunk[column], downcast="integer")
+            if stats is not None:
+                memory_bytes += int(chunk.memory_usage(deep=True).sum())
+            read_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            header = list(chunk.columns)
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                if worksheet is None or rows_in_sheet >= EXCEL_MAX_ROWS:
+                    worksheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+                    worksheet.append(header_cells(worksheet, header))
+                    rows_in_sheet = 1
+                worksheet.append(row)
+                rows_in_sheet += 1
+            rows_written += len(chunk)
+            write_seconds += time.perf_counter() - start
+            if progress_callback:
+                progress_callback(csv_file.tell(), total_bytes)
+
+    if worksheet is None:
+        # Header-only CSV: keep the columns so the workbook is not empty
+        worksheet = workbook.create_sheet("Sheet1")
+        if header:
+            worksheet.append(header_cells(worksheet, header))
+
+    start = time.perf_counter()
+    workbook.save(excel_file_path)
+    write_seconds += time.perf_counter() - start
+    if stats is not None:
+        stats.update(read_seconds=read_seconds, write_seconds=write_seconds, memory_bytes=memory_bytes)
+    if progress_callback:
+        progress_callback(total_bytes, total_bytes)
+    return rows_written
 
 def csv_to_excel(csv_file_path, excel_file_path, progress_bar):
-    try:
-        # Read the CSV file
-        df = pd.read_csv(csv_file_path)
-        progress_bar['value'] = 50
-        root.update_idletasks()
-        
-        # Write the DataFrame to an Excel file
-        df.to_excel(excel_file_path, index=False)
-        progress_bar['value'] = 100
+    def update_progress(bytes_read, total_bytes):
+        progress_bar['value'] = bytes_read * 100 / total_bytes if total_bytes else 100
         root.update_idletasks()
-        
+
+    try:
+        stream_csv_to_excel(csv_file_path, excel_file_path, progress_callback=update_progress)
+
         messagebox.showinfo("Success", f"CSV file has been successfully converted to Excel file at {excel_file_path}")
     except Exception as e:
         messagebox.showerror("Error", f"An error occurred: {e}")
@@ -40,44 +229,84 @@ def convert_file():
     else:
         messagebox.showwarning("Input required", "Please select both CSV file and Excel file path.")
 
-# Create the main window with a dark theme
-root = ThemedTk(theme="equilux")
-root.title("CSV to Excel Converter")
-
-# Style
-style = ttk.Style(root)
-root.configure(bg='#2b2b2b')
-
-style.configure("TLabel", foreground='#ffffff', background='#2b2b2b')
-style.configure("TButton", foreground='#ffffff', background='#444444', borderwidth=1, focusthickness=3, focuscolor='none', relief="flat")
-style.map("TButton", background=[('active', '#666666')])
-style.configure("TEntry", fieldbackground='#444444', foreground='#ffffff', borderwidth=1)
-style.map("TEntry", background=[('active', '#555555')])
-style.configure("TProgressbar", troughcolor='#444444', background='#00ff00', borderwidth=0)
-
-# CSV file selection
-csv_label = ttk.Label(root, text="Select CSV file:")
-csv_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
-csv_entry = ttk.Entry(root, width=50)
-csv_entry.grid(row=0, column=1, padx=10, pady=10)
-csv_browse_button = ttk.Button(root, text="Browse", command=browse_csv_file)
-csv_browse_button.grid(row=0, column=2, padx=10, pady=10)
-
-# Excel file selection
-excel_label = ttk.Label(root, text="Save as Excel file:")
-excel_label.grid(row=1, column=0, padx=10, pady=10, sticky="w")
-excel_entry = ttk.Entry(root, width=50)
-excel_entry.grid(row=1, column=1, padx=10, pady=10)
-excel_browse_button = ttk.Button(root, text="Browse", command=browse_excel_file)
-excel_browse_button.grid(row=1, column=2, padx=10, pady=10)
-
-# Convert button
-convert_button = ttk.Button(root, text="Convert", command=convert_file)
-convert_button.grid(row=2, columnspan=3, pady=20)
-
-# Progress bar
-progress_bar = ttk.Progressbar(root, orient="horizontal", length=300, mode="determinate")
-progress_bar.grid(row=3, columnspan=3, pady=10)
-
-# Run the GUI event loop
-root.mainloop()
+def create_gui():
+    global root, csv_entry, excel_entry, progress_bar
+    from ttkthemes import ThemedTk
+
+    # Create the main window with a dark theme
+    root = ThemedTk(theme="equilux")
+    root.title("CSV to Excel Converter")
+
+    # Style
+    style = ttk.Style(root)
+    root.configure(bg='#2b2b2b')
+
+    style.configure("TLabel", foreground='#ffffff', background='#2b2b2b')
+    style.configure("TButton", foreground='#ffffff', background='#444444', borderwidth=1, focusthickness=3, focuscolor='none', relief="flat")
+    style.map("TButton", background=[('active', '#666666')])
+    style.configure("TEntry", fieldbackground='#444444', foreground='#ffffff', borderwidth=1)
+    style.map("TEntry", background=[('active', '#555555')])
+    style.configure("TProgressbar", troughcolor='#444444', background='#00ff00', borderwidth=0)
+
+    # CSV file selection
+    csv_label = ttk.Label(root, text="Select CSV file:")
+    csv_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+    csv_entry = ttk.Entry(root, width=50)
+    csv_entry.grid(row=0, column=1, padx=10, pady=10)
+    csv_browse_button = ttk.Button(root, text="Browse", command=browse_csv_file)
+    csv_browse_button.grid(row=0, column=2, padx=10, pady=10)
+
+    # Excel file selection
+    excel_label = ttk.Label(root, text="Save as Excel file:")
+    excel_label.grid(row=1, column=0, padx=10, pady=10, sticky="w")
+    excel_entry = ttk.Entry(root, width=50)
+    excel_entry.grid(row=1, column=1, padx=10, pady=10)
+    excel_browse_button = ttk.Button(root, text="Browse", command=browse_excel_file)
+    excel_browse_button.grid(row=1, column=2, padx=10, pady=10)
+
+    # Convert button
+    convert_button = ttk.Button(root, text="Convert", command=convert_file)
+    convert_button.grid(row=2, columnspan=3, pady=20)
+
+    # Progress bar
+    progress_bar = ttk.Progressbar(root, orient="horizontal", length=300, mode="determinate")
+    progress_bar.grid(row=3, columnspan=3, pady=10)
+
+    # Run the GUI event loop
+    root.mainloop()
+
+def run_headless(args):
+    def print_progress(bytes_read, total_bytes):
+        percent = bytes_read * 100 / total_bytes if total_bytes else 100
+        print(f"\rConverted {percent:.0f}%", end="", file=sys.stderr, flush=True)
+
+    usecols = [column.strip() for column in args.columns.split(",")] if args.columns else None
+    if args.infer_dtypes:
+        report = convert_with_inferred_dtypes(args.csv_file, args.excel_file, args.sample_rows, usecols,
+                                              args.category_threshold, args.chunk_size, print_progress, sep=args.sep)
+        print(file=sys.stderr)
+        print(format_dtype_report(report))
+        return
+
+    start = time.perf_counter()
+    rows = stream_csv_to_excel(args.csv_file, args.excel_file, args.chunk_size, print_progress, sep=args.sep, usecols=usecols)
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(f"Wrote {rows} rows to {args.excel_file} in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CSV file to Excel. Starts the GUI when no files are given.")
+    parser.add_argument("csv_file", nargs="?", help="Path to the CSV file.")
+    parser.add_argument("excel_file", nargs="?", help="Path to save the Excel file.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="CSV rows parsed per chunk (default: %(default)s).")
+    parser.add_argument("--sep", default=",", help="CSV field separator (default: ',').")
+    parser.add_argument("--columns", help="Comma-separated list of columns to keep.")
+    parser.add_argument("--infer-dtypes", action="store_true", help="Sample the file to infer compact dtypes before converting, and print a memory/timing report.")
+    parser.add_argument("--sample-rows", type=int, default=DEFAULT_SAMPLE_ROWS, help="Rows sampled by --infer-dtypes (default: %(default)s).")
+    parser.add_argument("--category-threshold", type=float, default=DEFAULT_CATEGORY_THRESHOLD, help="Max unique/non-null ratio for categorical columns (default: %(default)s).")
+    args = parser.parse_args()
+
+    if args.csv_file and args.excel_file:
+        run_headless(args)
+    else:
+        create_gui()
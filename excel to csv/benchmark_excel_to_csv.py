@@ -0,0 +1,78 @@
+"""Benchmark the streaming Excel to CSV engine.
+
+Generates workbooks of 10k, 100k and 1M rows (cached in the work directory),
+converts each one in a fresh process and reports rows/sec and peak RSS.
+
+    python benchmark_excel_to_csv.py [--sizes 10000 100000 1000000] [--pandas]
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from excel_to_csv import stream_excel_to_csv
+
+def build_workbook(path, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+    worksheet.append(["id", "name", "amount", "created", "active"])
+    start = datetime.datetime(2020, 1, 1)
+    for i in range(rows):
+        worksheet.append([i, f"customer-{i}", i * 1.25, start + datetime.timedelta(minutes=i), i % 2 == 0])
+    workbook.save(path)
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_conversion(engine, excel_path, csv_path, results):
+    start = time.perf_counter()
+    if engine == "pandas":
+        import pandas as pd
+        df = pd.read_excel(excel_path, sheet_name="Sheet1")
+        df.to_csv(csv_path, index=False)
+        rows = len(df) + 1
+    else:
+        rows = stream_excel_to_csv(excel_path, "Sheet1", csv_path)
+    results.put((rows, time.perf_counter() - start, peak_rss_mb()))
+
+def measure(engine, excel_path, csv_path):
+    # A fresh process per run keeps peak RSS figures independent of each other
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_conversion, args=(engine, excel_path, csv_path, results))
+    process.start()
+    rows, elapsed, peak = results.get()
+    process.join()
+    return rows, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming Excel to CSV conversion.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10000, 100000, 1000000], help="Row counts to benchmark.")
+    parser.add_argument("--pandas", action="store_true", help="Also benchmark the pandas read_excel/to_csv path.")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "excel_to_csv_bench"), help="Directory for generated workbooks.")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    engines = ["stream", "pandas"] if args.pandas else ["stream"]
+
+    print(f"{'engine':<8} {'rows':>10} {'seconds':>9} {'rows/s':>10} {'peak RSS (MB)':>14}")
+    for size in args.sizes:
+        excel_path = os.path.join(args.workdir, f"bench_{size}.xlsx")
+        if not os.path.exists(excel_path):
+            print(f"Generating {excel_path}...", file=sys.stderr)
+            build_workbook(excel_path, size)
+        csv_path = os.path.join(args.workdir, f"bench_{size}.csv")
+        for engine in engines:
+            rows, elapsed, peak = measure(engine, excel_path, csv_path)
+            print(f"{engine:<8} {rows:>10} {elapsed:>9.2f} {rows / elapsed:>10.0f} {peak:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,211 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from tkinterdnd2 import DND_FILES, TkinterDnD
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import xml.etree.ElementTree as ET
+import argparse
+import csv
 import os
+import re
+import sys
+import time
+import zipfile
 
-def excel_to_csv(excel_file_path, sheet_name, csv_file_path, progress_var):
+# Number of worksheet rows buffered before they are flushed to the CSV file
+DEFAULT_CHUNK_SIZE = 10000
+
+def write_worksheet_csv(worksheet, csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
+    """Write the rows of an openpyxl worksheet to a CSV file in chunks.
+
+    At most ``chunk_size`` rows are held in memory at once.
+    ``progress_callback(rows_written, total_rows)`` is called after every chunk;
+    ``total_rows`` is None when the workbook does not store sheet dimensions.
+    Rows are padded with empty cells to the sheet's width, or to the header
+    row's width when the dimensions are not stored, since openpyxl drops the
+    trailing empty cells of a row it reads without them.
+    Returns the number of rows written, header row included.
+    """
+    total_rows = worksheet.max_row
+    width = worksheet.max_column
+    rows_written = 0
+    with open(csv_file_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        chunk = []
+        for row in worksheet.iter_rows(values_only=True):
+            if width is None:
+                width = len(row)
+            if len(row) < width:
+                row += (None,) * (width - len(row))
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.writerows(chunk)
+                rows_written += len(chunk)
+                chunk.clear()
+                if progress_callback:
+                    progress_callback(rows_written, total_rows)
+        if chunk:
+            writer.writerows(chunk)
+            rows_written += len(chunk)
+        if progress_callback:
+            progress_callback(rows_written, rows_written)
+    return rows_written
+
+def stream_excel_to_csv(excel_file_path, sheet_name, csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
+    """Stream a worksheet to a CSV file in bounded chunks of rows.
+
+    The workbook is opened in read-only mode, so rows are parsed lazily from the
+    sheet XML instead of materializing the whole sheet.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_file_path, read_only=True, data_only=True)
     try:
-        progress_var.set(10)
-        root.update_idletasks()
-        
-        # Read the Excel file
+        return write_worksheet_csv(workbook[sheet_name], csv_file_path, chunk_size, progress_callback)
+    finally:
+        workbook.close()
+
+def list_sheet_names(excel_file_path):
+    """Return the sheet names of an .xlsx workbook without loading it."""
+    # Only the small workbook part is read; shared strings and sheet data stay in the zip
+    with zipfile.ZipFile(excel_file_path) as archive:
+        workbook_xml = ET.fromstring(archive.read("xl/workbook.xml"))
+    return [sheet.get("name") for sheet in workbook_xml.iterfind("{*}sheets/{*}sheet")]
+
+def sheet_csv_paths(excel_file_path, sheet_names, output_dir):
+    """Map each sheet name to a unique ``<workbook>_<sheet>.csv`` path in output_dir."""
+    stem = os.path.splitext(os.path.basename(excel_file_path))[0]
+    paths = {}
+    used = set()
+    for sheet_name in sheet_names:
+        safe_name = re.sub(r"[^\w.-]+", "_", sheet_name).strip("_") or "sheet"
+        file_name = f"{stem}_{safe_name}.csv"
+        suffix = 2
+        while file_name.lower() in used:
+            file_name = f"{stem}_{safe_name}_{suffix}.csv"
+            suffix += 1
+        used.add(file_name.lower())
+        paths[sheet_name] = os.path.join(output_dir, file_name)
+    return paths
+
+# Workbook opened once per pool worker and reused for every sheet it exports
+_worker_workbook = None
+
+def _init_sheet_worker(excel_file_path):
+    global _worker_workbook
+    from openpyxl import load_workbook
+
+    _worker_workbook = load_workbook(excel_file_path, read_only=True, data_only=True)
+
+def _export_sheet(sheet_name, csv_file_path, chunk_size):
+    worksheet = _worker_workbook[sheet_name]
+    if not hasattr(worksheet, "iter_rows"):
+        # Chart sheets have no cells to export
+        return sheet_name, None, 0
+    return sheet_name, csv_file_path, write_worksheet_csv(worksheet, csv_file_path, chunk_size)
+
+def export_all_sheets(excel_file_path, output_dir, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
+    """Write every sheet of a workbook to its own CSV file in output_dir.
+
+    Sheets are spread over a pool of ``workers`` processes (default: one per
+    core); each worker opens the workbook once in read-only mode and streams the
+    sheets assigned to it. ``progress_callback(sheets_done, total_sheets, sheet_name)``
+    is called as each sheet finishes. Returns ``{sheet_name: (csv_path, rows)}``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    if excel_file_path.lower().endswith(".xls"):
+        # Legacy .xls workbooks are parsed once by pandas and written sequentially
+        frames = pd.read_excel(excel_file_path, sheet_name=None)
+        paths = sheet_csv_paths(excel_file_path, list(frames), output_dir)
+        results = {}
+        for done, (sheet_name, df) in enumerate(frames.items(), start=1):
+            df.to_csv(paths[sheet_name], index=False)
+            results[sheet_name] = (paths[sheet_name], len(df) + 1)
+            if progress_callback:
+                progress_callback(done, len(frames), sheet_name)
+        return results
+
+    sheet_names = list_sheet_names(excel_file_path)
+    paths = sheet_csv_paths(excel_file_path, sheet_names, output_dir)
+    workers = min(workers or os.cpu_count() or 1, len(sheet_names)) or 1
+    results = {}
+
+    if workers == 1:
+        _init_sheet_worker(excel_file_path)
+        try:
+            for done, sheet_name in enumerate(sheet_names, start=1):
+                _, csv_path, rows = _export_sheet(sheet_name, paths[sheet_name], chunk_size)
+                results[sheet_name] = (csv_path, rows)
+                if progress_callback:
+                    progress_callback(done, len(sheet_names), sheet_name)
+        finally:
+            _worker_workbook.close()
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_sheet_worker, initargs=(excel_file_path,)) as executor:
+        futures = [executor.submit(_export_sheet, name, paths[name], chunk_size) for name in sheet_names]
+        for done, future in enumerate(as_completed(futures), start=1):
+            sheet_name, csv_path, rows = future.result()
+            results[sheet_name] = (csv_path, rows)
+            if progress_callback:
+                progress_callback(done, len(sheet_names), sheet_name)
+    return {name: results[name] for name in sheet_names}
+
+def convert_excel_to_csv(excel_file_path, sheet_name, csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
+    """Convert one sheet, streaming .xlsx files and falling back to pandas for legacy .xls."""
+    if excel_file_path.lower().endswith(".xls"):
+        # openpyxl cannot read the binary .xls format
         df = pd.read_excel(excel_file_path, sheet_name=sheet_name)
-        progress_var.set(60)
-        root.update_idletasks()
-        
-        # Convert the DataFrame to a CSV file
         df.to_csv(csv_file_path, index=False)
-        progress_var.set(100)
+        if progress_callback:
+            progress_callback(len(df) + 1, len(df) + 1)
+        return len(df) + 1
+    return stream_excel_to_csv(excel_file_path, sheet_name, csv_file_path, chunk_size, progress_callback)
+
+def excel_to_csv(excel_file_path, sheet_name, csv_file_path, progress_var):
+    def update_progress(rows_written, total_rows):
+        if total_rows:
+            progress_var.set(min(100, rows_written * 100 / total_rows))
         root.update_idletasks()
-        
+
+    try:
+        progress_var.set(0)
+        root.update_idletasks()
+
+        convert_excel_to_csv(excel_file_path, sheet_name, csv_file_path, progress_callback=update_progress)
+
         messagebox.showinfo("Success", f"Excel file '{os.path.basename(excel_file_path)}' has been converted to CSV file '{os.path.basename(csv_file_path)}'")
         progress_var.set(0)
     except Exception as e:
         messagebox.showerror("Error", f"Failed to convert Excel to CSV: {e}")
         progress_var.set(0)
 
+def excel_to_csv_all_sheets(excel_file_path, output_dir, progress_var):
+    def update_progress(sheets_done, total_sheets, sheet_name):
+        progress_var.set(sheets_done * 100 / total_sheets)
+        root.update_idletasks()
+
+    try:
+        progress_var.set(0)
+        root.update_idletasks()
+
+        results = export_all_sheets(excel_file_path, output_dir, progress_callback=update_progress)
+
+        messagebox.showinfo("Success", f"Exported {len(results)} sheets from '{os.path.basename(excel_file_path)}' to '{output_dir}'")
+        progress_var.set(0)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to convert Excel to CSV: {e}")
+        progress_var.set(0)
+
 def browse_excel_file():
     file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
     excel_file_path.set(file_path)
 
 def browse_save_location():
-    file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+    if all_sheets_var.get():
+        file_path = filedialog.askdirectory()
+    else:
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
     csv_file_path.set(file_path)
 
 def convert_file():
@@ -38,6 +213,10 @@ def convert_file():
         messagebox.showerror("Error", "Please select both Excel file and CSV save location.")
         return
 
+    if all_sheets_var.get():
+        excel_to_csv_all_sheets(excel_file_path.get(), csv_file_path.get(), progress_var)
+        return
+
     sheet_name = sheet_name_entry.get()
     if not sheet_name:
         messagebox.showerror("Error", "Please enter the sheet name.")
@@ -58,53 +237,95 @@ def create_tooltip(widget, text):
     widget.bind("<Enter>", lambda e: tooltip.deiconify())
     widget.bind("<Leave>", lambda e: tooltip.withdraw())
 
-# Create the main window
-root = TkinterDnD.Tk()
-root.title("Excel to CSV Converter")
-root.geometry("500x350")
-root.resizable(False, False)
-root.configure(bg="#2b2b2b")
-
-# Styles
-style = ttk.Style()
-style.theme_use("clam")
-style.configure("TLabel", background="#2b2b2b", foreground="#e1e1e1", font=("Helvetica", 10))
-style.configure("TButton", background="#4f4f4f", foreground="#e1e1e1", font=("Helvetica", 10), padding=5)
-style.map("TButton", background=[("active", "#6c6c6c")])
-style.configure("TEntry", background="#4f4f4f", foreground="#e1e1e1", fieldbackground="#4f4f4f", font=("Helvetica", 10))
-style.configure("TProgressbar", thickness=20, background="#4caf50")
-
-# Create and place widgets
-ttk.Label(root, text="Excel File:").grid(row=0, column=0, padx=10, pady=10, sticky="e")
-excel_file_path = tk.StringVar()
-excel_entry = ttk.Entry(root, textvariable=excel_file_path, width=40)
-excel_entry.grid(row=0, column=1, padx=10, pady=10)
-ttk.Button(root, text="Browse", command=browse_excel_file).grid(row=0, column=2, padx=10, pady=10)
-create_tooltip(excel_entry, "Drag and drop an Excel file here or click 'Browse' to select one.")
-
-ttk.Label(root, text="Sheet Name:").grid(row=1, column=0, padx=10, pady=10, sticky="e")
-sheet_name_entry = ttk.Entry(root, width=40)
-sheet_name_entry.grid(row=1, column=1, padx=10, pady=10)
-sheet_name_entry.insert(0, "Sheet1")  # Default sheet name
-create_tooltip(sheet_name_entry, "Enter the name of the sheet to convert.")
-
-ttk.Label(root, text="Save CSV As:").grid(row=2, column=0, padx=10, pady=10, sticky="e")
-csv_file_path = tk.StringVar()
-csv_entry = ttk.Entry(root, textvariable=csv_file_path, width=40)
-csv_entry.grid(row=2, column=1, padx=10, pady=10)
-ttk.Button(root, text="Browse", command=browse_save_location).grid(row=2, column=2, padx=10, pady=10)
-create_tooltip(csv_entry, "Choose the location and name for the saved CSV file.")
-
-ttk.Button(root, text="Convert", command=convert_file).grid(row=3, column=0, columnspan=3, pady=20)
-
-# Progress bar
-progress_var = tk.DoubleVar()
-progress_bar = ttk.Progressbar(root, variable=progress_var, maximum=100)
-progress_bar.grid(row=4, column=0, columnspan=3, padx=10, pady=10, sticky="ew")
-
-# Bind drag and drop events
-excel_entry.drop_target_register(DND_FILES)
-excel_entry.dnd_bind('<<Drop>>', on_drop)
-
-# Run the GUI event loop
-root.mainloop()
+def create_gui():
+    global root, excel_file_path, csv_file_path, sheet_name_entry, all_sheets_var, progress_var
+    from tkinterdnd2 import DND_FILES, TkinterDnD
+
+    # Create the main window
+    root = TkinterDnD.Tk()
+    root.title("Excel to CSV Converter")
+    root.geometry("500x350")
+    root.resizable(False, False)
+    root.configure(bg="#2b2b2b")
+
+    # Styles
+    style = ttk.Style()
+    style.theme_use("clam")
+    style.configure("TLabel", background="#2b2b2b", foreground="#e1e1e1", font=("Helvetica", 10))
+    style.configure("TButton", background="#4f4f4f", foreground="#e1e1e1", font=("Helvetica", 10), padding=5)
+    style.map("TButton", background=[("active", "#6c6c6c")])
+    style.configure("TEntry", background="#4f4f4f", foreground="#e1e1e1", fieldbackground="#4f4f4f", font=("Helvetica", 10))
+    style.configure("TProgressbar", thickness=20, background="#4caf50")
+
+    # Create and place widgets
+    ttk.Label(root, text="Excel File:").grid(row=0, column=0, padx=10, pady=10, sticky="e")
+    excel_file_path = tk.StringVar()
+    excel_entry = ttk.Entry(root, textvariable=excel_file_path, width=40)
+    excel_entry.grid(row=0, column=1, padx=10, pady=10)
+    ttk.Button(root, text="Browse", command=browse_excel_file).grid(row=0, column=2, padx=10, pady=10)
+    create_tooltip(excel_entry, "Drag and drop an Excel file here or click 'Browse' to select one.")
+
+    ttk.Label(root, text="Sheet Name:").grid(row=1, column=0, padx=10, pady=10, sticky="e")
+    sheet_name_entry = ttk.Entry(root, width=40)
+    sheet_name_entry.grid(row=1, column=1, padx=10, pady=10)
+    sheet_name_entry.insert(0, "Sheet1")  # Default sheet name
+    create_tooltip(sheet_name_entry, "Enter the name of the sheet to convert.")
+    all_sheets_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(root, text="All sheets", variable=all_sheets_var).grid(row=1, column=2, padx=10, pady=10)
+
+    ttk.Label(root, text="Save CSV As:").grid(row=2, column=0, padx=10, pady=10, sticky="e")
+    csv_file_path = tk.StringVar()
+    csv_entry = ttk.Entry(root, textvariable=csv_file_path, width=40)
+    csv_entry.grid(row=2, column=1, padx=10, pady=10)
+    ttk.Button(root, text="Browse", command=browse_save_location).grid(row=2, column=2, padx=10, pady=10)
+    create_tooltip(csv_entry, "Choose the location and name for the saved CSV file, or a folder when converting all sheets.")
+
+    ttk.Button(root, text="Convert", command=convert_file).grid(row=3, column=0, columnspan=3, pady=20)
+
+    # Progress bar
+    progress_var = tk.DoubleVar()
+    progress_bar = ttk.Progressbar(root, variable=progress_var, maximum=100)
+    progress_bar.grid(row=4, column=0, columnspan=3, padx=10, pady=10, sticky="ew")
+
+    # Bind drag and drop events
+    excel_entry.drop_target_register(DND_FILES)
+    excel_entry.dnd_bind('<<Drop>>', on_drop)
+
+    # Run the GUI event loop
+    root.mainloop()
+
+def run_headless(args):
+    def print_progress(rows_written, total_rows):
+        total = total_rows if total_rows else "?"
+        print(f"\rConverted {rows_written}/{total} rows", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    if args.all_sheets:
+        def print_sheet_progress(sheets_done, total_sheets, sheet_name):
+            print(f"[{sheets_done}/{total_sheets}] {sheet_name}", file=sys.stderr)
+
+        results = export_all_sheets(args.excel_file, args.csv_file, args.workers, args.chunk_size, print_sheet_progress)
+        elapsed = time.perf_counter() - start
+        rows = sum(rows for _, rows in results.values())
+        print(f"Wrote {len(results)} sheets ({rows} rows) to {args.csv_file} in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+        return
+
+    rows = convert_excel_to_csv(args.excel_file, args.sheet, args.csv_file, args.chunk_size, print_progress)
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(f"Wrote {rows} rows to {args.csv_file} in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert an Excel sheet to CSV. Starts the GUI when no files are given.")
+    parser.add_argument("excel_file", nargs="?", help="Path to the Excel workbook.")
+    parser.add_argument("csv_file", nargs="?", help="Path to save the CSV file (a folder with --all-sheets).")
+    parser.add_argument("--sheet", default="Sheet1", help="Name of the sheet to convert (default: Sheet1).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows buffered per write (default: %(default)s).")
+    parser.add_argument("--all-sheets", action="store_true", help="Write every sheet to its own CSV file in the csv_file folder.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --all-sheets (default: one per core).")
+    args = parser.parse_args()
+
+    if args.excel_file and args.csv_file:
+        run_headless(args)
+    else:
+        create_gui()
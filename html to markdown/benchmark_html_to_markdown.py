@@ -0,0 +1,245 @@
+"""Benchmark the single-pass tag rewriter against the former regex passes.
+
+Generates an HTML page of roughly --size-mb megabytes with regular markup
+and escaped HTML snippets (the text html2text turns back into tags), runs
+html2text once, then post-processes its output with the eleven per-element
+regex passes html_to_markdown() used to run and with rewrite_html_tags(),
+reporting the time of each and whether the results are identical.
+
+    python benchmark_html_to_markdown.py [--size-mb 10]
+"""
+import argparse
+import html
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+import html2text
+
+from html_to_markdown import rewrite_html_tags
+
+SECTION = """<h2>Section {i}</h2>
+<p>Paragraph {i} with <strong>bold</strong>, <em>emphasis</em> and a <a href="https://example.com/{i}">link</a>.</p>
+<ul><li>First point</li><li>Second point</li></ul>
+<table><tr><th>Key</th><th>Value</th></tr><tr><td>id</td><td>{i}</td></tr></table>
+<p>Markup example: {snippet}</p>
+<pre><code>def f{i}():
+    return {i}</code></pre>
+"""
+
+SNIPPETS = [
+    "<ul><li>Apples</li><li>Pears</li></ul>",
+    "<ol><li>Mix</li><li>Bake</li></ol>",
+    "<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>2</td></tr></table>",
+    '<span style="color: red;">red</span> and <div class="note">note</div>',
+    "<blockquote>Quoted</blockquote> then <hr>",
+    '<figure><img src="cat.png"><figcaption>A cat</figcaption></figure>',
+    "<pre><code>x = 1</code></pre>",
+    # Never closed anywhere in the page
+    "the <details> element",
+]
+
+def build_page(path, size_mb):
+    target = size_mb * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("<html><body>\n")
+        i = 0
+        while out.tell() < target:
+            snippet = html.escape(SNIPPETS[i % len(SNIPPETS)], quote=False)
+            out.write(SECTION.format(i=i, snippet=snippet))
+            i += 1
+        out.write("</body></html>\n")
+
+# The per-element regex passes html_to_markdown() ran before rewrite_html_tags()
+def legacy_postprocess(markdown):
+    markdown = handle_code_blocks(markdown)
+    markdown = handle_horizontal_rules(markdown)
+    markdown = handle_lists(markdown)
+    markdown = handle_blockquotes(markdown)
+    markdown = handle_tables(markdown)
+    markdown = handle_inline_styles(markdown)
+    markdown = handle_forms(markdown)
+    markdown = handle_divs_and_spans(markdown)
+    markdown = handle_html5_semantic_elements(markdown)
+    markdown = handle_details_and_summary(markdown)
+    markdown = handle_images_with_captions(markdown)
+    return markdown
+
+def handle_code_blocks(markdown):
+    logging.debug('Handling code blocks')
+    code_block_pattern = re.compile(r'<pre><code>(.*?)</code></pre>', re.DOTALL)
+    markdown = code_block_pattern.sub(r'```\1```', markdown)
+    return markdown
+
+def handle_horizontal_rules(markdown):
+    logging.debug('Handling horizontal rules')
+    hr_pattern = re.compile(r'<hr\s*/?>', re.IGNORECASE)
+    markdown = hr_pattern.sub(r'---', markdown)
+    return markdown
+
+def handle_lists(markdown):
+    logging.debug('Handling lists')
+    markdown = re.sub(r'<ul>(.*?)</ul>', handle_unordered_list, markdown, flags=re.DOTALL)
+    markdown = re.sub(r'<ol>(.*?)</ol>', handle_ordered_list, markdown, flags=re.DOTALL)
+    return markdown
+
+def handle_unordered_list(match):
+    logging.debug('Handling unordered list')
+    items = re.findall(r'<li>(.*?)</li>', match.group(1), re.DOTALL)
+    nested_ul = re.compile(r'<ul>(.*?)</ul>', re.DOTALL)
+    nested_ol = re.compile(r'<ol>(.*?)</ol>', re.DOTALL)
+    formatted_items = []
+    for item in items:
+        sub_items = []
+        if nested_ul.search(item):
+            sub_items.append(nested_ul.sub(handle_unordered_list, item))
+        elif nested_ol.search(item):
+            sub_items.append(nested_ol.sub(handle_ordered_list, item))
+        else:
+            sub_items.append(item.strip())
+        formatted_items.append('- ' + '\n  '.join(sub_items))
+    return '\n'.join(formatted_items)
+
+def handle_ordered_list(match):
+    logging.debug('Handling ordered list')
+    items = re.findall(r'<li>(.*?)</li>', match.group(1), re.DOTALL)
+    nested_ul = re.compile(r'<ul>(.*?)</ul>', re.DOTALL)
+    nested_ol = re.compile(r'<ol>(.*?)</ol>', re.DOTALL)
+    formatted_items = []
+    for i, item in enumerate(items, start=1):
+        sub_items = []
+        if nested_ul.search(item):
+            sub_items.append(nested_ul.sub(handle_unordered_list, item))
+        elif nested_ol.search(item):
+            sub_items.append(nested_ol.sub(handle_ordered_list, item))
+        else:
+            sub_items.append(item.strip())
+        formatted_items.append(f'{i}. ' + '\n  '.join(sub_items))
+    return '\n'.join(formatted_items)
+
+def handle_blockquotes(markdown):
+    logging.debug('Handling blockquotes')
+    blockquote_pattern = re.compile(r'<blockquote>(.*?)</blockquote>', re.DOTALL)
+    markdown = blockquote_pattern.sub(r'> \1', markdown)
+    return markdown
+
+def handle_tables(markdown):
+    logging.debug('Handling tables')
+    table_pattern = re.compile(r'<table>(.*?)</table>', re.DOTALL)
+    markdown = table_pattern.sub(convert_table, markdown)
+    return markdown
+
+def convert_table(match):
+    logging.debug('Converting table')
+    table_html = match.group(1)
+    rows = re.findall(r'<tr>(.*?)</tr>', table_html, re.DOTALL)
+    table_md = []
+    for row in rows:
+        cols = re.findall(r'<t[dh](?:[^>]*)>(.*?)</t[dh]>', row, re.DOTALL)
+        table_md.append('| ' + ' | '.join(col.strip() for col in cols) + ' |')
+    if table_md:
+        header_separator = '| ' + ' | '.join(['---'] * len(cols)) + ' |'
+        table_md.insert(1, header_separator)
+    return '\n'.join(table_md)
+
+def handle_inline_styles(markdown):
+    logging.debug('Handling inline styles')
+    style_pattern = re.compile(r'<span style=".*?">(.*?)</span>', re.DOTALL)
+    markdown = style_pattern.sub(r'\1', markdown)
+    
+    # Handle additional inline styles
+    markdown = re.sub(r'<span style="font-weight: bold;">(.*?)</span>', r'**\1**', markdown)
+    markdown = re.sub(r'<span style="font-weight: normal;">(.*?)</span>', r'\1', markdown)
+    markdown = re.sub(r'<span style="text-align: center;">(.*?)</span>', r'\n<center>\1</center>\n', markdown)
+    markdown = re.sub(r'<span style="text-align: right;">(.*?)</span>', r'\n<div align="right">\1</div>\n', markdown)
+    
+    return markdown
+
+def handle_forms(markdown):
+    logging.debug('Handling forms')
+    form_pattern = re.compile(r'<form[^>]*>(.*?)</form>', re.DOTALL)
+    markdown = form_pattern.sub(convert_form, markdown)
+    return markdown
+
+def convert_form(match):
+    logging.debug('Converting form')
+    form_html = match.group(1)
+    # Convert basic form elements to Markdown
+    form_md = re.sub(r'<input[^>]*>', 'Input Field', form_html)
+    form_md = re.sub(r'<textarea[^>]*>(.*?)</textarea>', 'Text Area:\n\1', form_md, flags=re.DOTALL)
+    form_md = re.sub(r'<button[^>]*>(.*?)</button>', 'Button: \1', form_md)
+    return f'\n\nForm:\n{form_md}'
+
+def handle_divs_and_spans(markdown):
+    logging.debug('Handling divs and spans')
+    div_pattern = re.compile(r'<div[^>]*>(.*?)</div>', re.DOTALL)
+    span_pattern = re.compile(r'<span[^>]*>(.*?)</span>', re.DOTALL)
+    markdown = div_pattern.sub(r'\1', markdown)
+    markdown = span_pattern.sub(r'\1', markdown)
+    return markdown
+
+def handle_html5_semantic_elements(markdown):
+    logging.debug('Handling HTML5 semantic elements')
+    markdown = re.sub(r'<article[^>]*>(.*?)</article>', r'\1', markdown, flags=re.DOTALL)
+    markdown = re.sub(r'<section[^>]*>(.*?)</section>', r'\1', markdown, flags=re.DOTALL)
+    markdown = re.sub(r'<nav[^>]*>(.*?)</nav>', r'\1', markdown, flags=re.DOTALL)
+    markdown = re.sub(r'<aside[^>]*>(.*?)</aside>', r'\1', markdown, flags=re.DOTALL)
+    markdown = re.sub(r'<header[^>]*>(.*?)</header>', r'\1', markdown, flags=re.DOTALL)
+    markdown = re.sub(r'<footer[^>]*>(.*?)</footer>', r'\1', markdown, flags=re.DOTALL)
+    return markdown
+
+def handle_details_and_summary(markdown):
+    logging.debug('Handling details and summary')
+    details_pattern = re.compile(r'<details[^>]*>(.*?)</details>', re.DOTALL)
+    summary_pattern = re.compile(r'<summary[^>]*>(.*?)</summary>', re.DOTALL)
+    
+    markdown = details_pattern.sub(lambda m: f'<details>\n{summary_pattern.sub(lambda s: f"### Summary: {s.group(1)}", m.group(1))}\n{summary_pattern.sub("", m.group(1))}\n</details>', markdown)
+    return markdown
+
+def handle_images_with_captions(markdown):
+    logging.debug('Handling images with captions')
+    img_pattern = re.compile(r'<figure>\s*<img[^>]*src="([^"]*)"[^>]*>\s*<figcaption>(.*?)</figcaption>\s*</figure>', re.DOTALL)
+    markdown = img_pattern.sub(r'![\2](\1)', markdown)
+    return markdown
+
+# GUI Implementation using Tkinter
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark html_to_markdown post-processing.")
+    parser.add_argument("--size-mb", type=int, default=10, help="Approximate size of the generated HTML page.")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "html_to_markdown_bench"), help="Directory for generated files.")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    html_path = os.path.join(args.workdir, f"bench_{args.size_mb}mb.html")
+    if not os.path.exists(html_path):
+        print(f"Generating {html_path}...", file=sys.stderr)
+        build_page(html_path, args.size_mb)
+    with open(html_path, "r", encoding="utf-8") as f:
+        page = f.read()
+    # Both engines log every step at DEBUG level; that cost is part of the comparison
+    logging.basicConfig(filename=os.path.join(args.workdir, "bench.log"), level=logging.DEBUG, force=True)
+
+    converter = html2text.HTML2Text()
+    converter.body_width = 0
+    seconds, markdown = timed(converter.handle, page)
+    markdown = markdown.strip()
+    print(f"{len(page) / (1024 * 1024):.1f} MB of HTML, {len(markdown) / (1024 * 1024):.1f} MB after html2text ({seconds:.2f}s)")
+
+    print(f"{'engine':<8} {'seconds':>9}")
+    outputs = {}
+    for name, function in (("regex", legacy_postprocess), ("single", rewrite_html_tags)):
+        seconds, outputs[name] = timed(function, markdown)
+        print(f"{name:<8} {seconds:>9.3f}")
+    print("Outputs identical" if outputs["regex"] == outputs["single"] else "Outputs DIFFER")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Check html_to_markdown against the golden corpus.
+
+Every golden/NAME.html is converted with the default configuration and
+compared with golden/NAME.md. --update rewrites the expected files after an
+intended change in output.
+
+    python check_golden.py [--update]
+"""
+import argparse
+import configparser
+import difflib
+import glob
+import os
+import sys
+
+from html_to_markdown import DEFAULT_CONFIG, html_to_markdown
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+def default_config():
+    config = configparser.ConfigParser()
+    config['DEFAULT'] = DEFAULT_CONFIG
+    return config
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare html_to_markdown output with the golden corpus.")
+    parser.add_argument("--update", action="store_true", help="Write the current output as the expected output.")
+    args = parser.parse_args()
+
+    config = default_config()
+    failures = 0
+    html_paths = sorted(glob.glob(os.path.join(GOLDEN_DIR, "*.html")))
+    for html_path in html_paths:
+        expected_path = os.path.splitext(html_path)[0] + ".md"
+        with open(html_path, "r", encoding="utf-8") as f:
+            actual = html_to_markdown(f.read(), config)
+        if args.update:
+            with open(expected_path, "w", encoding="utf-8", newline="") as f:
+                f.write(actual)
+            continue
+        with open(expected_path, "r", encoding="utf-8", newline="") as f:
+            expected = f.read()
+        if actual != expected:
+            failures += 1
+            print(f"FAIL {os.path.basename(html_path)}")
+            sys.stdout.writelines(difflib.unified_diff(expected.splitlines(True), actual.splitlines(True), "expected", "actual"))
+            print()
+
+    if args.update:
+        print(f"Updated {len(html_paths)} expected outputs")
+    else:
+        print(f"{len(html_paths) - failures} of {len(html_paths)} golden files match")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,10 @@ import logging
 import configparser
 import os
 import argparse
+import glob
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
@@ -11,34 +15,41 @@ from tkinter import filedialog, messagebox
 logging.basicConfig(filename='html_to_markdown.log', level=logging.DEBUG, 
                     format='%(asctime)s %(levelname)s %(message)s')
 
+DEFAULT_CONFIG = {
+    'ignore_links': 'False',
+    'ignore_images': 'False',
+    'ignore_emphasis': 'False',
+    'ignore_tables': 'False',
+    'ignore_anchors': 'False',
+    'ignore_blockquotes': 'False',
+    'ignore_code': 'False',
+    'ignore_horizontal_rules': 'False',
+    'ignore_lists': 'False',
+    'ignore_divs_and_spans': 'False',
+    'ignore_html5_elements': 'False',
+    'ignore_forms': 'False',
+    'ignore_details_summary': 'False',
+    'body_width': '0'
+}
+
+# Characters of HTML read per step in streaming mode
+STREAM_CHUNK_SIZE = 1 << 20
+# convert_file() streams HTML files larger than this many bytes
+STREAM_THRESHOLD = 32 * 1024 * 1024
+# Characters a leftover tag that never closes may hold back while streaming
+MAX_PENDING_CHARS = 1 << 20
+
 def load_config(config_file='config.ini'):
     config = configparser.ConfigParser()
     if os.path.exists(config_file):
         config.read(config_file)
     else:
-        config['DEFAULT'] = {
-            'ignore_links': 'False',
-            'ignore_images': 'False',
-            'ignore_emphasis': 'False',
-            'ignore_tables': 'False',
-            'ignore_anchors': 'False',
-            'ignore_blockquotes': 'False',
-            'ignore_code': 'False',
-            'ignore_horizontal_rules': 'False',
-            'ignore_lists': 'False',
-            'ignore_divs_and_spans': 'False',
-            'ignore_html5_elements': 'False',
-            'ignore_forms': 'False',
-            'ignore_details_summary': 'False',
-            'body_width': '0'
-        }
+        config['DEFAULT'] = DEFAULT_CONFIG
         with open(config_file, 'w') as configfile:
             config.write(configfile)
     return config
 
-def html_to_markdown(html, config):
-    logging.debug('Starting HTML to Markdown conversion')
-    
+def create_converter(config):
     # Create an instance of the HTML2Text converter
     h = html2text.HTML2Text()
     
@@ -55,6 +66,11 @@ def html_to_markdown(html, config):
     h.ignore_divs_and_spans = config.getboolean('DEFAULT', 'ignore_divs_and_spans')
     h.ignore_html5_elements = config.getboolean('DEFAULT', 'ignore_html5_elements')
     h.body_width = config.getint('DEFAULT', 'body_width')
+    return h
+
+def html_to_markdown(html, config):
+    logging.debug('Starting HTML to Markdown conversion')
+    h = create_converter(config)
 
     # Convert HTML to Markdown
     try:
@@ -68,157 +84,417 @@ def html_to_markdown(html, config):
     markdown = markdown.strip()
 
     # Handle additional formatting manually
-    markdown = handle_code_blocks(markdown)
-    markdown = handle_horizontal_rules(markdown)
-    markdown = handle_lists(markdown)
-    markdown = handle_blockquotes(markdown)
-    markdown = handle_tables(markdown)
-    markdown = handle_inline_styles(markdown)
-    markdown = handle_forms(markdown)
-    markdown = handle_divs_and_spans(markdown)
-    markdown = handle_html5_semantic_elements(markdown)
-    markdown = handle_details_and_summary(markdown)
-    markdown = handle_images_with_captions(markdown)
+    markdown = rewrite_html_tags(markdown)
 
     logging.debug('HTML to Markdown conversion completed')
     return markdown
 
-def handle_code_blocks(markdown):
-    logging.debug('Handling code blocks')
-    code_block_pattern = re.compile(r'<pre><code>(.*?)</code></pre>', re.DOTALL)
-    markdown = code_block_pattern.sub(r'```\1```', markdown)
-    return markdown
-
-def handle_horizontal_rules(markdown):
-    logging.debug('Handling horizontal rules')
-    hr_pattern = re.compile(r'<hr\s*/?>', re.IGNORECASE)
-    markdown = hr_pattern.sub(r'---', markdown)
-    return markdown
-
-def handle_lists(markdown):
-    logging.debug('Handling lists')
-    markdown = re.sub(r'<ul>(.*?)</ul>', handle_unordered_list, markdown, flags=re.DOTALL)
-    markdown = re.sub(r'<ol>(.*?)</ol>', handle_ordered_list, markdown, flags=re.DOTALL)
-    return markdown
-
-def handle_unordered_list(match):
-    logging.debug('Handling unordered list')
-    items = re.findall(r'<li>(.*?)</li>', match.group(1), re.DOTALL)
-    nested_ul = re.compile(r'<ul>(.*?)</ul>', re.DOTALL)
-    nested_ol = re.compile(r'<ol>(.*?)</ol>', re.DOTALL)
-    formatted_items = []
-    for item in items:
-        sub_items = []
-        if nested_ul.search(item):
-            sub_items.append(nested_ul.sub(handle_unordered_list, item))
-        elif nested_ol.search(item):
-            sub_items.append(nested_ol.sub(handle_ordered_list, item))
+# Tags html2text leaves in its output (they come from escaped text such as
+# "&lt;ul&gt;") and rewrite_html_tags() turns into Markdown. Tags in
+# EXACT_TAGS are only rewritten without attributes; the others take any.
+EXACT_TAGS = ('ul', 'ol', 'li', 'blockquote', 'table', 'tr', 'figure', 'figcaption')
+ATTRIBUTE_TAGS = ('td', 'th', 'span', 'div', 'form', 'input', 'textarea', 'button', 'details', 'summary', 'img',
+                  'article', 'section', 'nav', 'aside', 'header', 'footer')
+# Tags only rewritten directly inside the given parent
+PARENT_TAGS = {'li': ('ul', 'ol'), 'tr': ('table',), 'td': ('tr',), 'th': ('tr',),
+               'figcaption': ('figure',), 'summary': ('details',), 'img': ('figure',)}
+# One alternation for every tag of interest: the <pre><code> and
+# </code></pre> pairs, <hr> in any case, then opening and closing tags.
+# Attributes cannot contain "<", so a stray "<div" costs one short scan.
+TAG_PATTERN = re.compile(
+    r'<(?:(pre><code|/code></pre)|[hH][rR]\s*/?|(/?)(' + '|'.join(sorted(EXACT_TAGS + ATTRIBUTE_TAGS, key=len, reverse=True))
+    + r')(?![a-zA-Z0-9])([^<>]*))>')
+IMG_SRC_PATTERN = re.compile(r'.*src="([^"]*)"', re.DOTALL)
+
+def join_parts(parts):
+    # Figure and details frames hold (text, kind, value) tuples for their
+    # image, caption and summaries
+    return ''.join(part if isinstance(part, str) else part[0] for part in parts)
+
+def render_element(name, content, extra):
+    if name == 'pre':
+        return f'```{content}```'
+    if name == 'ul':
+        return '\n'.join('- ' + item for item in extra)
+    if name == 'ol':
+        return '\n'.join(f'{i}. {item}' for i, item in enumerate(extra, start=1))
+    if name == 'blockquote':
+        return '> ' + content
+    if name == 'table':
+        if not extra:
+            return ''
+        rows = ['| ' + ' | '.join(cells) + ' |' for cells in extra]
+        rows.insert(1, '| ' + ' | '.join(['---'] * len(extra[0])) + ' |')
+        return '\n'.join(rows)
+    if name == 'form':
+        return f'\n\nForm:\n{content}'
+    if name == 'textarea':
+        return f'Text Area:\n{content}'
+    if name == 'button':
+        return f'Button: {content}'
+    if name == 'details':
+        summaries = ''.join(f'### Summary: {summary}\n' for summary in extra)
+        return f'<details>\n{summaries}{content}\n</details>'
+    return content
+
+def figure_markdown(parts):
+    # Only <figure> <img src="..."> <figcaption>...</figcaption> </figure>,
+    # with nothing but whitespace in between, becomes an image
+    items = [part for part in parts if not isinstance(part, str) or part.strip()]
+    if len(items) != 2 or isinstance(items[0], str) or isinstance(items[1], str):
+        return None
+    (_, kind, src), (_, caption_kind, caption) = items
+    if kind != 'img' or caption_kind != 'figcaption' or src is None:
+        return None
+    return f'![{caption}]({src})'
+
+class TagRewriter(object):
+    """Rewrites the HTML tags left in html2text output in one linear pass.
+
+    Code blocks, horizontal rules, lists, blockquotes, tables, forms,
+    details/summary and captioned images become Markdown; divs, spans and
+    HTML5 section elements are unwrapped. Elements are matched with a stack,
+    so nested lists and nested divs pair up correctly, and tags that never
+    close are left as they are.
+
+    Text can be fed in pieces cut between tags. feed() returns the output
+    that is final, i.e. everything outside still-open elements. Once open
+    elements hold more than ``max_pending`` characters they are written out
+    as they are, which keeps memory bounded when a tag never closes.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING_CHARS):
+        # Each open element is [name, opening tag, parts, extra]; extra
+        # collects the items, rows or cells of the element
+        self.stack = []
+        self.output = []
+        self.max_pending = max_pending
+        self.pending = 0
+
+    def close_top(self, closing_tag):
+        stack = self.stack
+        name, opening_tag, frame_parts, extra = stack.pop()
+        content = join_parts(frame_parts)
+        parent = stack[-1] if stack else None
+        parent_parts = parent[2] if parent else self.output
+        verbatim = opening_tag + content + closing_tag
+        if name == 'li':
+            parent[3].append(content.strip())
+        elif name == 'tr':
+            parent[3].append(extra)
+        elif name in ('td', 'th'):
+            parent[3].append(content.strip())
+        elif name in ('summary', 'figcaption'):
+            parent_parts.append((verbatim, name, content))
+            return
+        elif name == 'figure':
+            image = figure_markdown(frame_parts)
+            parent_parts.append(verbatim if image is None else image)
+            return
+        elif name == 'details':
+            # Summaries become headings at the top, the rest is the body
+            summaries = [part[2] for part in frame_parts if not isinstance(part, str)]
+            body = ''.join(part for part in frame_parts if isinstance(part, str))
+            parent_parts.append(render_element(name, body, summaries))
+            return
         else:
-            sub_items.append(item.strip())
-        formatted_items.append('- ' + '\n  '.join(sub_items))
-    return '\n'.join(formatted_items)
-
-def handle_ordered_list(match):
-    logging.debug('Handling ordered list')
-    items = re.findall(r'<li>(.*?)</li>', match.group(1), re.DOTALL)
-    nested_ul = re.compile(r'<ul>(.*?)</ul>', re.DOTALL)
-    nested_ol = re.compile(r'<ol>(.*?)</ol>', re.DOTALL)
-    formatted_items = []
-    for i, item in enumerate(items, start=1):
-        sub_items = []
-        if nested_ul.search(item):
-            sub_items.append(nested_ul.sub(handle_unordered_list, item))
-        elif nested_ol.search(item):
-            sub_items.append(nested_ol.sub(handle_ordered_list, item))
-        else:
-            sub_items.append(item.strip())
-        formatted_items.append(f'{i}. ' + '\n  '.join(sub_items))
-    return '\n'.join(formatted_items)
-
-def handle_blockquotes(markdown):
-    logging.debug('Handling blockquotes')
-    blockquote_pattern = re.compile(r'<blockquote>(.*?)</blockquote>', re.DOTALL)
-    markdown = blockquote_pattern.sub(r'> \1', markdown)
-    return markdown
-
-def handle_tables(markdown):
-    logging.debug('Handling tables')
-    table_pattern = re.compile(r'<table>(.*?)</table>', re.DOTALL)
-    markdown = table_pattern.sub(convert_table, markdown)
-    return markdown
-
-def convert_table(match):
-    logging.debug('Converting table')
-    table_html = match.group(1)
-    rows = re.findall(r'<tr>(.*?)</tr>', table_html, re.DOTALL)
-    table_md = []
-    for row in rows:
-        cols = re.findall(r'<t[dh](?:[^>]*)>(.*?)</t[dh]>', row, re.DOTALL)
-        table_md.append('| ' + ' | '.join(col.strip() for col in cols) + ' |')
-    if table_md:
-        header_separator = '| ' + ' | '.join(['---'] * len(cols)) + ' |'
-        table_md.insert(1, header_separator)
-    return '\n'.join(table_md)
-
-def handle_inline_styles(markdown):
-    logging.debug('Handling inline styles')
-    style_pattern = re.compile(r'<span style=".*?">(.*?)</span>', re.DOTALL)
-    markdown = style_pattern.sub(r'\1', markdown)
-    
-    # Handle additional inline styles
-    markdown = re.sub(r'<span style="font-weight: bold;">(.*?)</span>', r'**\1**', markdown)
-    markdown = re.sub(r'<span style="font-weight: normal;">(.*?)</span>', r'\1', markdown)
-    markdown = re.sub(r'<span style="text-align: center;">(.*?)</span>', r'\n<center>\1</center>\n', markdown)
-    markdown = re.sub(r'<span style="text-align: right;">(.*?)</span>', r'\n<div align="right">\1</div>\n', markdown)
-    
-    return markdown
-
-def handle_forms(markdown):
-    logging.debug('Handling forms')
-    form_pattern = re.compile(r'<form[^>]*>(.*?)</form>', re.DOTALL)
-    markdown = form_pattern.sub(convert_form, markdown)
-    return markdown
-
-def convert_form(match):
-    logging.debug('Converting form')
-    form_html = match.group(1)
-    # Convert basic form elements to Markdown
-    form_md = re.sub(r'<input[^>]*>', 'Input Field', form_html)
-    form_md = re.sub(r'<textarea[^>]*>(.*?)</textarea>', 'Text Area:\n\1', form_md, flags=re.DOTALL)
-    form_md = re.sub(r'<button[^>]*>(.*?)</button>', 'Button: \1', form_md)
-    return f'\n\nForm:\n{form_md}'
-
-def handle_divs_and_spans(markdown):
-    logging.debug('Handling divs and spans')
-    div_pattern = re.compile(r'<div[^>]*>(.*?)</div>', re.DOTALL)
-    span_pattern = re.compile(r'<span[^>]*>(.*?)</span>', re.DOTALL)
-    markdown = div_pattern.sub(r'\1', markdown)
-    markdown = span_pattern.sub(r'\1', markdown)
-    return markdown
+            text = render_element(name, content, extra)
+            if name in ('ul', 'ol') and parent and parent[0] == 'li':
+                # A nested list goes on its own lines, indented under the item
+                text = '\n  ' + text.replace('\n', '\n  ')
+            parent_parts.append(text)
+            return
+        # Kept as written in case the enclosing element never closes
+        parent_parts.append(verbatim)
+
+    def flatten_above(self, depth):
+        # Elements still open when an outer element closes (or the text ends,
+        # depth -1) are kept as written. Their parts are moved in one go, so
+        # thousands of unclosed elements cost no more than the text they hold.
+        stack = self.stack
+        parent_parts = stack[depth][2] if depth >= 0 else self.output
+        for _, opening_tag, frame_parts, _ in stack[depth + 1:]:
+            parent_parts.append(opening_tag)
+            parent_parts.extend(part if isinstance(part, str) else part[0] for part in frame_parts)
+        del stack[depth + 1:]
+
+    def take_output(self):
+        text = join_parts(self.output)
+        self.output = []
+        self.pending = 0
+        return text
+
+    def feed(self, markdown):
+        stack = self.stack
+        parts = stack[-1][2] if stack else self.output
+        pos = 0
+        for match in TAG_PATTERN.finditer(markdown):
+            tag = match.group(0)
+            pair, slash, name, attributes = match.groups()
+            parts.append(markdown[pos:match.start()])
+            pos = match.end()
+
+            if pair is None and name is None:
+                parts.append('---')
+                continue
+            if pair is not None:
+                name, slash = 'pre', pair[0] == '/'
+            elif attributes and (slash or name in EXACT_TAGS):
+                parts.append(tag)
+                continue
+
+            if slash:
+                names = ('td', 'th') if name in ('td', 'th') else (name,)
+                depth = len(stack) - 1
+                while depth >= 0 and stack[depth][0] not in names:
+                    depth -= 1
+                if depth < 0:
+                    parts.append(tag)
+                    continue
+                self.flatten_above(depth)
+                self.close_top(tag)
+            elif name in PARENT_TAGS and (not stack or stack[-1][0] not in PARENT_TAGS[name]):
+                parts.append(tag)
+                continue
+            elif name in ('input', 'textarea', 'button') and not any(frame[0] == 'form' for frame in stack):
+                parts.append(tag)
+                continue
+            elif name == 'input':
+                parts.append('Input Field')
+                continue
+            elif name == 'img':
+                src = IMG_SRC_PATTERN.match(attributes)
+                parts.append((tag, 'img', src.group(1) if src else None))
+                continue
+            else:
+                stack.append([name, tag, [], []])
+            parts = stack[-1][2] if stack else self.output
+        parts.append(markdown[pos:])
+
+        if stack:
+            self.pending += len(markdown)
+            if self.pending <= self.max_pending:
+                return ''
+            self.flatten_above(-1)
+        return self.take_output()
+
+    def close(self):
+        self.flatten_above(-1)
+        return self.take_output()
+
+def rewrite_html_tags(markdown):
+    """Rewrite the HTML tags left in html2text output, see TagRewriter."""
+    logging.debug('Rewriting leftover HTML tags')
+    rewriter = TagRewriter(max_pending=len(markdown))
+    return rewriter.feed(markdown) + rewriter.close()
+
+def complete_blocks_end(text):
+    # End of the last blank line followed by an unindented line, so html2text
+    # output cut there wraps and rewrites the same as in one piece
+    end = len(text)
+    while True:
+        cut = text.rfind('\n\n', 0, end)
+        if cut == -1:
+            return 0
+        if cut + 2 < len(text) and not text[cut + 2].isspace():
+            return cut + 2
+        end = cut + 1
+
+def html_to_markdown_stream(html_file, markdown_file, config, chunk_size=STREAM_CHUNK_SIZE):
+    """Convert HTML read from ``html_file`` to Markdown written to ``markdown_file``.
+
+    The HTML is fed to html2text a chunk at a time, and Markdown is written
+    as soon as html2text has finished a block, so memory depends on the
+    largest block rather than the file size. The output matches
+    html_to_markdown() except that a leftover tag whose element holds more
+    than MAX_PENDING_CHARS characters is kept as written. Returns the number
+    of characters written.
+    """
+    logging.debug('Starting streaming HTML to Markdown conversion')
+    h = create_converter(config)
+    h.start = True
+    nbsp = '\xa0' if h.unicode_snob else ' '
+    rewriter = TagRewriter()
+    carry = ''
+    pending = ''
+    written = 0
+    started = False
+
+    def write_block(block, last=False):
+        nonlocal written, started
+        block = h.optwrap(block)
+        # Same as stripping the whole html2text output
+        if not started:
+            block = block.lstrip()
+            started = bool(block)
+        if last:
+            block = block.rstrip()
+        text = rewriter.feed(block)
+        if last:
+            text += rewriter.close()
+        markdown_file.write(text)
+        written += len(text)
+
+    while True:
+        chunk = html_file.read(chunk_size)
+        if not chunk:
+            break
+        # Fed up to the last tag only: html2text spaces text differently when
+        # one run of text arrives in two calls (e.g. after <b>)
+        chunk = carry + chunk
+        cut = chunk.rfind('<')
+        if cut <= 0:
+            carry = chunk
+            continue
+        carry = chunk[cut:]
+        h.feed(chunk[:cut])
+        # html2text may still take back its newest piece (a "[" before a heading)
+        pieces = h.outtextlist[:-1]
+        del h.outtextlist[:-1]
+        pending += ''.join(pieces).replace('&nbsp_place_holder;', nbsp)
+        end = complete_blocks_end(pending)
+        if end:
+            write_block(pending[:end])
+            pending = pending[end:]
+
+    h.feed(carry)
+    h.feed('')
+    write_block(pending + h.finish(), last=True)
+    logging.debug('Streaming HTML to Markdown conversion completed')
+    return written
+
+def convert_file(input_file, output_file, config, stream=None):
+    """Convert one HTML file to a Markdown file.
+
+    ``stream`` selects html_to_markdown_stream(); by default it is used for
+    files larger than STREAM_THRESHOLD.
+    """
+    if stream is None:
+        stream = os.path.getsize(input_file) > STREAM_THRESHOLD
+    with open(input_file, 'r', encoding='utf-8') as f:
+        if stream:
+            with open(output_file, 'w', encoding='utf-8') as out:
+                html_to_markdown_stream(f, out, config)
+            return
+        html_content = f.read()
 
-def handle_html5_semantic_elements(markdown):
-    logging.debug('Handling HTML5 semantic elements')
-    markdown = re.sub(r'<article[^>]*>(.*?)</article>', r'\1', markdown, flags=re.DOTALL)
-    markdown = re.sub(r'<section[^>]*>(.*?)</section>', r'\1', markdown, flags=re.DOTALL)
-    markdown = re.sub(r'<nav[^>]*>(.*?)</nav>', r'\1', markdown, flags=re.DOTALL)
-    markdown = re.sub(r'<aside[^>]*>(.*?)</aside>', r'\1', markdown, flags=re.DOTALL)
-    markdown = re.sub(r'<header[^>]*>(.*?)</header>', r'\1', markdown, flags=re.DOTALL)
-    markdown = re.sub(r'<footer[^>]*>(.*?)</footer>', r'\1', markdown, flags=re.DOTALL)
-    return markdown
+    markdown_content = html_to_markdown(html_content, config)
 
-def handle_details_and_summary(markdown):
-    logging.debug('Handling details and summary')
-    details_pattern = re.compile(r'<details[^>]*>(.*?)</details>', re.DOTALL)
-    summary_pattern = re.compile(r'<summary[^>]*>(.*?)</summary>', re.DOTALL)
-    
-    markdown = details_pattern.sub(lambda m: f'<details>\n{summary_pattern.sub(lambda s: f"### Summary: {s.group(1)}", m.group(1))}\n{summary_pattern.sub("", m.group(1))}\n</details>', markdown)
-    return markdown
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(markdown_content)
 
-def handle_images_with_captions(markdown):
-    logging.debug('Handling images with captions')
-    img_pattern = re.compile(r'<figure>\s*<img[^>]*src="([^"]*)"[^>]*>\s*<figcaption>(.*?)</figcaption>\s*</figure>', re.DOTALL)
-    markdown = img_pattern.sub(r'![\2](\1)', markdown)
-    return markdown
+# Extensions picked up when a batch source is a directory
+HTML_EXTENSIONS = ('.html', '.htm')
+# Print a progress line every this many files in batch mode
+BATCH_PROGRESS_EVERY = 1000
+
+def find_html_files(source):
+    """Return ``(path, base_dir)`` pairs for a file, a directory or a glob pattern.
+
+    Directories are searched recursively. base_dir is the directory the
+    output tree mirrors: the directory itself, or the deepest directory
+    shared by every file a glob matched.
+    """
+    if os.path.isdir(source):
+        found = []
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            found.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.lower().endswith(HTML_EXTENSIONS))
+        return [(path, source) for path in found]
+    if os.path.isfile(source):
+        return [(source, os.path.dirname(source))]
+    matches = sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+    if not matches:
+        return []
+    base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in matches])
+    return [(path, base_dir) for path in matches]
+
+def mirrored_output_path(source_path, base_dir, output_dir):
+    relative = os.path.relpath(os.path.abspath(source_path), os.path.abspath(base_dir))
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + '.md')
+
+# Configuration parsed once per pool worker and shared by all its files.
+# Each file still gets its own HTML2Text, which keeps per-document state
+# (open tags, pending links, abbreviations) that must not leak across files.
+_worker_config = None
+
+def _init_batch_worker(config_values):
+    global _worker_config
+    _worker_config = configparser.ConfigParser()
+    _worker_config['DEFAULT'] = config_values
+
+def _convert_batch_file(source_path, output_path):
+    try:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        convert_file(source_path, output_path, _worker_config)
+        size = os.path.getsize(source_path)
+    except Exception as e:
+        logging.error(f"An error occurred while converting {source_path}: {e}")
+        return source_path, 0, f"{type(e).__name__}: {e}"
+    return source_path, size, None
+
+def convert_batch(sources, output_dir, config, workers=None, progress_callback=None):
+    """Convert every HTML file named by ``sources`` (files, directories or globs).
+
+    Each source's tree is mirrored into output_dir with .md extensions (next
+    to the HTML files when output_dir is None). Files are spread over
+    ``workers`` processes (default: one per core) that parse the
+    configuration once. A file that fails is reported and does not stop the
+    batch.
+
+    ``progress_callback(done, total)`` is called after every file. Returns
+    ``{"files", "failed", "bytes", "seconds"}`` with failed as (path, error)
+    pairs.
+    """
+    start = time.perf_counter()
+    inputs = []
+    outputs = []
+    for source in sources:
+        for path, base_dir in find_html_files(source):
+            inputs.append(path)
+            outputs.append(mirrored_output_path(path, base_dir, output_dir if output_dir is not None else base_dir))
+    summary = {"files": 0, "failed": [], "bytes": 0, "seconds": 0.0}
+    config_values = dict(config['DEFAULT'])
+    workers = min(workers or os.cpu_count() or 1, len(inputs)) or 1
+
+    def record(done, result):
+        source_path, size, error = result
+        if error:
+            summary["failed"].append((source_path, error))
+        else:
+            summary["files"] += 1
+            summary["bytes"] += size
+        if progress_callback:
+            progress_callback(done, len(inputs))
+
+    if inputs and workers == 1:
+        _init_batch_worker(config_values)
+        for done, (source_path, output_path) in enumerate(zip(inputs, outputs), start=1):
+            record(done, _convert_batch_file(source_path, output_path))
+    elif inputs:
+        # Wiki exports are mostly small pages, so they go out in batches
+        chunksize = max(1, min(64, len(inputs) // (workers * 8)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(config_values,)) as executor:
+            for done, result in enumerate(executor.map(_convert_batch_file, inputs, outputs, chunksize=chunksize), start=1):
+                record(done, result)
+
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+def format_batch_summary(summary):
+    seconds = summary["seconds"] or 1e-9
+    lines = [
+        f"Converted {summary['files']} files in {summary['seconds']:.2f}s "
+        f"({summary['files'] / seconds:.1f} files/s, {summary['bytes'] / seconds / (1024 * 1024):.2f} MB/s of HTML)"
+    ]
+    if summary["failed"]:
+        lines.append(f"{len(summary['failed'])} files failed:")
+        lines.extend(f"  {path}: {error}" for path, error in summary["failed"])
+    return "\n".join(lines)
+
+def print_progress(done, total):
+    if done % BATCH_PROGRESS_EVERY == 0 or done == total:
+        print(f"{done}/{total} files", file=sys.stderr)
 
 # GUI Implementation using Tkinter
 def select_input_file():
@@ -244,13 +520,12 @@ def convert_html_to_markdown():
 
     config = load_config(config_file)
 
-    with open(input_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-
-    markdown_content = html_to_markdown(html_content, config)
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
+    try:
+        convert_file(input_file, output_file, config)
+    except Exception as e:
+        logging.error(f"An error occurred while converting {input_file}: {e}")
+        messagebox.showerror("Error", f"Conversion failed: {e}")
+        return
 
     messagebox.showinfo("Success", f'Conversion completed. Markdown saved to {output_file}')
 
@@ -284,5 +559,26 @@ def create_gui():
 
     root.mainloop()
 
+def main():
+    parser = argparse.ArgumentParser(description="Convert HTML to Markdown. Without sources, opens the GUI.")
+    parser.add_argument("sources", nargs='*', help="HTML files, directories or glob patterns (quote them) to convert in batch mode.")
+    parser.add_argument("-o", "--output-dir", default=None, help="Directory to mirror the converted files into (default: next to each HTML file).")
+    parser.add_argument("--config", default='config.ini', help="Configuration file (default: config.ini).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU core).")
+    args = parser.parse_args()
+
+    if not args.sources:
+        create_gui()
+        return
+
+    config = load_config(args.config)
+    summary = convert_batch(args.sources, args.output_dir, config, args.workers, print_progress)
+    if not summary["files"] and not summary["failed"]:
+        print("No HTML files found.")
+        exit(1)
+    print(format_batch_summary(summary))
+    if summary["failed"]:
+        exit(1)
+
 if __name__ == '__main__':
-    create_gui()
+    main()
@@ -0,0 +1,333 @@
+"""Headless HTML to PDF rendering shared by the PDF converters.
+
+Renders batches of HTML files or strings with wkhtmltopdf when it is on PATH,
+or with weasyprint otherwise. Work is spread over a bounded pool whose workers
+outlive a single document, because starting a renderer costs more than
+rendering a short document: each wkhtmltopdf process renders a batch of
+documents read from its stdin, and weasyprint runs in long-lived worker
+processes that keep their fonts and page stylesheet loaded.
+
+Given an asset_cache.AssetCache, each document is first rewritten to link
+cached copies of its stylesheets, fonts and images, and that copy is rendered
+from beside the original, so references the cache leaves alone still resolve.
+
+Options use pdfkit's spelling, e.g. ``{"page-size": "A4", "margin-top": "10mm"}``.
+"""
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from asset_cache import file_url, format_asset_summary
+
+BACKENDS = ("wkhtmltopdf", "weasyprint")
+# Where the Windows installer puts wkhtmltopdf, tried when it is not on PATH
+WINDOWS_WKHTMLTOPDF = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
+# Documents rendered per wkhtmltopdf process
+WKHTMLTOPDF_BATCH_SIZE = 25
+# Seconds a single document may take before its renderer is killed
+DOCUMENT_TIMEOUT = 120
+
+# Page objects in a PDF, as opposed to the /Pages tree nodes
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+
+
+def find_wkhtmltopdf():
+    """Return the wkhtmltopdf executable ($WKHTMLTOPDF, then PATH), or None."""
+    path = os.environ.get("WKHTMLTOPDF") or shutil.which("wkhtmltopdf")
+    if path:
+        return path
+    return WINDOWS_WKHTMLTOPDF if os.path.isfile(WINDOWS_WKHTMLTOPDF) else None
+
+
+def weasyprint_available():
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        # OSError: installed, but the Pango libraries it needs are missing
+        return False
+    return True
+
+
+def default_backend():
+    if find_wkhtmltopdf():
+        return "wkhtmltopdf"
+    if weasyprint_available():
+        return "weasyprint"
+    raise RuntimeError("No HTML to PDF renderer found: install wkhtmltopdf (on PATH) or weasyprint.")
+
+
+def count_pdf_pages(pdf_path):
+    with open(pdf_path, "rb") as f:
+        return len(_PAGE_OBJECT.findall(f.read()))
+
+
+def _is_complete_pdf(pdf_path):
+    try:
+        with open(pdf_path, "rb") as f:
+            f.seek(max(0, os.path.getsize(pdf_path) - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+def wkhtmltopdf_args(options):
+    args = ["--quiet", "--enable-local-file-access"]
+    for key, value in options.items():
+        args.append("--" + key.lstrip("-"))
+        if value not in (None, ""):
+            args.append(str(value))
+    return args
+
+
+def _stdin_quote(arg):
+    # wkhtmltopdf splits each stdin line like a shell: quotes and backslashes
+    return '"' + arg.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _render_wkhtmltopdf_batch(binary, args, jobs):
+    # One process renders every (html_path, pdf_path) job, one stdin line each.
+    # Outputs are checked afterwards; a job without a complete PDF is rendered
+    # again on its own to get its error message.
+    for _, pdf_path in jobs:
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+    lines = "".join(" ".join(_stdin_quote(arg) for arg in args + [html_path, pdf_path]) + "\n" for html_path, pdf_path in jobs)
+    try:
+        subprocess.run([binary, "--read-args-from-stdin"], input=lines, capture_output=True, text=True,
+                       timeout=DOCUMENT_TIMEOUT * len(jobs))
+    except subprocess.TimeoutExpired:
+        pass
+
+    results = []
+    for html_path, pdf_path in jobs:
+        error = None
+        if not _is_complete_pdf(pdf_path):
+            try:
+                process = subprocess.run([binary] + args + [html_path, pdf_path], capture_output=True, text=True,
+                                         timeout=DOCUMENT_TIMEOUT)
+                if not _is_complete_pdf(pdf_path):
+                    error = process.stderr.strip() or f"wkhtmltopdf exited with status {process.returncode}"
+            except subprocess.TimeoutExpired:
+                error = f"Timed out after {DOCUMENT_TIMEOUT}s"
+        results.append((pdf_path, 0 if error else count_pdf_pages(pdf_path), error))
+    return results
+
+
+def page_css(options):
+    """Translate page size, orientation and margin options into an @page rule."""
+    rules = []
+    size = options.get("page-size")
+    orientation = options.get("orientation")
+    if size or orientation:
+        rules.append(f"size: {size or 'A4'} {(orientation or '').lower()}".strip() + ";")
+    for side in ("top", "right", "bottom", "left"):
+        margin = options.get(f"margin-{side}")
+        if margin:
+            rules.append(f"margin-{side}: {margin};")
+    return "@page { " + " ".join(rules) + " }" if rules else ""
+
+
+# Set once per weasyprint worker process
+_worker_weasyprint = None
+_worker_options = None
+_worker_render_settings = {}
+
+
+def _init_weasyprint_worker(options):
+    global _worker_weasyprint, _worker_options, _worker_render_settings
+    import weasyprint
+    from weasyprint.text.fonts import FontConfiguration
+    _worker_weasyprint = weasyprint
+    _worker_options = dict(options)
+    font_config = FontConfiguration()
+    css = page_css(options)
+    stylesheets = [weasyprint.CSS(string=css, font_config=font_config)] if css else []
+    _worker_render_settings = {"stylesheets": stylesheets, "font_config": font_config}
+
+
+def _render_weasyprint(source, pdf_path, is_string):
+    try:
+        if is_string:
+            html = _worker_weasyprint.HTML(string=source)
+        else:
+            html = _worker_weasyprint.HTML(filename=source)
+        document = html.render(**_worker_render_settings)
+        document.write_pdf(pdf_path)
+    except Exception as e:
+        return pdf_path, 0, f"{type(e).__name__}: {e}"
+    return pdf_path, len(document.pages), None
+
+
+class HtmlPdfService(object):
+    """Renders batches of HTML documents to PDF on a bounded pool of workers.
+
+    ``backend`` is "wkhtmltopdf" or "weasyprint" (default: wkhtmltopdf if it
+    is found, else weasyprint); ``workers`` bounds how many renderers run at
+    once (default: one per core). The pool is started on first use and kept
+    until close(), so consecutive batches reuse the same workers.
+    ``asset_cache`` optionally gives an AssetCache whose copies of linked
+    assets are used in place of the originals.
+
+    render_files() and render_strings() return ``{"documents", "pages",
+    "failed", "seconds"}`` with failed as (pdf_path, error) pairs, plus the
+    cache's counters as "assets" when there is a cache. A document that fails
+    does not stop the batch.
+    """
+
+    def __init__(self, backend=None, workers=None, options=None, asset_cache=None):
+        self.backend = backend or default_backend()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {self.backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.binary = find_wkhtmltopdf() if self.backend == "wkhtmltopdf" else None
+        if self.backend == "wkhtmltopdf" and self.binary is None:
+            raise RuntimeError("wkhtmltopdf was not found on PATH.")
+        self.workers = workers or os.cpu_count() or 1
+        self.options = dict(options or {})
+        self.asset_cache = asset_cache
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _executor(self):
+        if self.executor is None:
+            if self.backend == "wkhtmltopdf":
+                # Threads only wait on the wkhtmltopdf processes
+                self.executor = ThreadPoolExecutor(max_workers=self.workers)
+            else:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_weasyprint_worker,
+                                                    initargs=(self.options,))
+        return self.executor
+
+    def _write_documents(self, sources, is_string, temp_dir, copies):
+        # Each document as a file, linking cached assets when there is a
+        # cache. Strings go to temp_dir. A file's rewritten copy goes next to
+        # it, so every reference the cache did not rewrite still resolves as
+        # it did; the copies are listed in copies for the caller to remove.
+        # Undecodable bytes are passed through unchanged.
+        html_paths = []
+        for index, source in enumerate(sources):
+            if is_string:
+                text = source
+                if self.asset_cache is not None:
+                    try:
+                        text = self.asset_cache.rewrite_html(source)
+                    except (OSError, ValueError):
+                        pass
+                html_paths.append(os.path.join(temp_dir, f"document{index}.html"))
+                with open(html_paths[-1], "w", encoding="utf-8", errors="surrogateescape") as f:
+                    f.write(text)
+                continue
+            # Whatever goes wrong here, the original is rendered instead, and
+            # a file that cannot be read fails in the renderer like any other
+            html_paths.append(source)
+            try:
+                with open(source, "r", encoding="utf-8", errors="surrogateescape") as f:
+                    text = self.asset_cache.rewrite_html(f.read(), file_url(source))
+                stem, extension = os.path.splitext(os.path.basename(source))
+                fd, copy_path = tempfile.mkstemp(suffix=extension, prefix=f".{stem}-", dir=os.path.dirname(os.path.abspath(source)))
+            except (OSError, ValueError):
+                continue
+            copies.append(copy_path)
+            try:
+                with open(fd, "w", encoding="utf-8", errors="surrogateescape") as f:
+                    f.write(text)
+            except OSError:
+                continue
+            html_paths[-1] = copy_path
+        return html_paths
+
+    def _render(self, sources, pdf_paths, is_string, progress_callback):
+        start = time.perf_counter()
+        summary = {"documents": 0, "pages": 0, "failed": [], "seconds": 0.0}
+        total = len(pdf_paths)
+
+        def record(done, result):
+            pdf_path, pages, error = result
+            if error:
+                summary["failed"].append((pdf_path, error))
+            else:
+                summary["documents"] += 1
+                summary["pages"] += pages
+            if progress_callback:
+                progress_callback(done, total)
+
+        copies = []
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                if self.asset_cache is not None or (is_string and self.backend == "wkhtmltopdf"):
+                    # wkhtmltopdf only reads files, and cached assets are linked
+                    # from a rewritten copy of each document
+                    sources = self._write_documents(sources, is_string, temp_dir, copies)
+                    is_string = False
+                if self.backend == "wkhtmltopdf":
+                    jobs = list(zip(sources, pdf_paths))
+                    # Small batches keep every worker busy; large ones spread a
+                    # process start over up to WKHTMLTOPDF_BATCH_SIZE documents
+                    size = max(1, min(WKHTMLTOPDF_BATCH_SIZE, -(-total // self.workers)))
+                    batches = [jobs[i:i + size] for i in range(0, total, size)]
+                    args = wkhtmltopdf_args(self.options)
+                    done = 0
+                    for results in self._executor().map(lambda batch: _render_wkhtmltopdf_batch(self.binary, args, batch), batches):
+                        for result in results:
+                            done += 1
+                            record(done, result)
+                elif self.workers == 1:
+                    if _worker_options != self.options:
+                        _init_weasyprint_worker(self.options)
+                    for done, (source, pdf_path) in enumerate(zip(sources, pdf_paths), start=1):
+                        record(done, _render_weasyprint(source, pdf_path, is_string))
+                elif total:
+                    chunksize = max(1, min(16, total // (self.workers * 4)))
+                    results = self._executor().map(_render_weasyprint, sources, pdf_paths, [is_string] * total, chunksize=chunksize)
+                    for done, result in enumerate(results, start=1):
+                        record(done, result)
+        finally:
+            for copy_path in copies:
+                try:
+                    os.remove(copy_path)
+                except OSError:
+                    pass
+
+        if self.asset_cache is not None:
+            self.asset_cache.save()
+            summary["assets"] = self.asset_cache.stats()
+        summary["seconds"] = time.perf_counter() - start
+        return summary
+
+    def render_files(self, jobs, progress_callback=None):
+        """Render each ``(html_path, pdf_path)`` pair."""
+        jobs = list(jobs)
+        return self._render([html_path for html_path, _ in jobs], [pdf_path for _, pdf_path in jobs], False, progress_callback)
+
+    def render_strings(self, jobs, progress_callback=None):
+        """Render each ``(html_text, pdf_path)`` pair. Relative URLs in the HTML are not resolved
+        unless it has a <base href>."""
+        jobs = list(jobs)
+        return self._render([html for html, _ in jobs], [pdf_path for _, pdf_path in jobs], True, progress_callback)
+
+
+def format_render_summary(summary, backend):
+    seconds = summary["seconds"] or 1e-9
+    lines = [
+        f"Rendered {summary['documents']} documents ({summary['pages']} pages) with {backend} in {summary['seconds']:.2f}s "
+        f"({summary['documents'] / seconds:.1f} documents/s, {summary['pages'] / seconds:.1f} pages/s)"
+    ]
+    if "assets" in summary:
+        lines.append(format_asset_summary(summary["assets"]))
+    if summary["failed"]:
+        lines.append(f"{len(summary['failed'])} documents failed:")
+        lines.extend(f"  {path}: {error}" for path, error in summary["failed"])
+    return "\n".join(lines)
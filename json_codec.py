@@ -0,0 +1,193 @@
+"""JSON encoding and decoding shared by the data converters.
+
+Uses orjson when it is installed, then ujson, then the standard library. The
+output matches json.dumps with the same settings; calls a fast backend cannot
+serve exactly (integers beyond 64 bits, non-string keys, NaN and infinity,
+ASCII escaping of non-ASCII text, zero indent, floats the standard library
+spells with an exponent such as ``1e-05``) are handed to the standard library.
+"""
+import codecs
+import json
+import math
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif ujson is not None:
+    BACKEND = "ujson"
+else:
+    BACKEND = "json"
+
+COMPACT_SEPARATORS = (",", ":")
+# Integers with 19 or more digits may not fit in 64 bits, which orjson would
+# turn into floats; such documents are parsed by the standard library
+_LONG_DIGITS = re.compile(r"[0-9]{19}")
+_LONG_DIGITS_BYTES = re.compile(rb"[0-9]{19}")
+# How the fast backends spell a float that repr() writes with an exponent:
+# with an exponent of their own (1e20 for 1e+20) or in full (0.00001 for
+# 1e-05). Only output containing one is searched for such floats.
+_EXPONENT_SPELLING = re.compile(r"[0-9][eE]|0\.0000")
+_EXPONENT_SPELLING_BYTES = re.compile(rb"[0-9][eE]|0\.0000")
+# Never produced by the encoders (control characters are always escaped),
+# so it can stand in for one indentation step while re-indenting
+_INDENT_MARK = "\0"
+# The one ASCII character json.dumps escapes that orjson and ujson do not
+_DEL = "\x7f"
+
+
+def _escape_non_ascii(error):
+    # Encoding error handler that spells non-ASCII characters the way
+    # json.dumps(ensure_ascii=True) does, including surrogate pairs
+    escaped = []
+    for char in error.object[error.start:error.end]:
+        code = ord(char)
+        if code > 0xFFFF:
+            code -= 0x10000
+            escaped.append("\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF)))
+        else:
+            escaped.append("\\u%04x" % code)
+    return "".join(escaped), error.end
+
+
+codecs.register_error("json_codec.escape", _escape_non_ascii)
+
+
+def _escape_del(text):
+    # json.dumps(ensure_ascii=True) escapes everything outside ' '-'~'. The
+    # fast backends escape control characters and (with the error handler
+    # above) non-ASCII text, but write DEL raw; it can only occur in strings.
+    return text.replace(_DEL, "\\u007f")
+
+
+def _reindent(text, indent, level):
+    # orjson only indents by two spaces. JSON text never contains a raw newline
+    # inside a string, so every run of spaces after a newline is indentation.
+    text = text.replace("\n  ", "\n" + _INDENT_MARK)
+    while _INDENT_MARK + "  " in text:
+        text = text.replace(_INDENT_MARK + "  ", _INDENT_MARK * 2)
+    if level:
+        text = _INDENT_MARK * level + text.replace("\n", "\n" + _INDENT_MARK * level)
+    return text.replace(_INDENT_MARK, " " * indent)
+
+
+def _is_non_finite(value):
+    return not math.isfinite(value)
+
+
+def _is_exponent_spelled(value):
+    # repr() is json.dumps's spelling of a float
+    return "e" in repr(value)
+
+
+def _has_float(obj, test):
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if test(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level):
+    separators = COMPACT_SEPARATORS if indent is None else None
+    text = json.dumps(obj, indent=indent, sort_keys=sort_keys, ensure_ascii=ensure_ascii, separators=separators)
+    if level and indent:
+        prefix = " " * (indent * level)
+        text = prefix + text.replace("\n", "\n" + prefix)
+    return text
+
+
+def _dumps_orjson(obj, indent, sort_keys, ensure_ascii, level):
+    # orjson never escapes non-ASCII text. For compact output the standard
+    # library's C encoder escapes in one pass, faster than escaping afterwards;
+    # its indented encoder is pure Python and loses to orjson plus escaping.
+    if (indent is None and ensure_ascii) or (indent is not None and indent <= 0):
+        return _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level)
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    try:
+        data = orjson.dumps(obj, option=option)
+    except TypeError:
+        return _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level)
+    if b"null" in data and _has_float(obj, _is_non_finite):
+        # orjson writes NaN and infinity as null
+        return _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level)
+    if _EXPONENT_SPELLING_BYTES.search(data) and _has_float(obj, _is_exponent_spelled):
+        return _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level)
+    if ensure_ascii and not data.isascii():
+        text = data.decode("utf-8").encode("ascii", "json_codec.escape").decode("ascii")
+    else:
+        text = data.decode("utf-8")
+    if ensure_ascii and _DEL in text:
+        text = _escape_del(text)
+    if indent and (indent != 2 or level):
+        text = _reindent(text, indent, level)
+    return text
+
+
+def _dumps_ujson(obj, indent, sort_keys, ensure_ascii, level):
+    # ujson's indented layout differs from the standard library's
+    if indent is not None:
+        return _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level)
+    try:
+        text = ujson.dumps(obj, sort_keys=sort_keys, ensure_ascii=ensure_ascii, escape_forward_slashes=False)
+    except (TypeError, OverflowError):
+        return _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level)
+    if _EXPONENT_SPELLING.search(text) and _has_float(obj, _is_exponent_spelled):
+        return _dumps_stdlib(obj, indent, sort_keys, ensure_ascii, level)
+    return _escape_del(text) if ensure_ascii and _DEL in text else text
+
+
+_DUMPS = {"orjson": _dumps_orjson, "ujson": _dumps_ujson, "json": _dumps_stdlib}
+
+
+def dumps(obj, indent=None, sort_keys=False, ensure_ascii=True, level=0):
+    """Serialize ``obj`` to a JSON string.
+
+    ``indent=None`` writes compact JSON (no spaces after separators); an
+    integer pretty-prints like ``json.dumps(obj, indent=indent)``. ``level``
+    shifts every line right by that many indents, for writing the items of an
+    enclosing array one at a time.
+    """
+    return _DUMPS[BACKEND](obj, indent, sort_keys, ensure_ascii, level)
+
+
+def dump(obj, fp, indent=None, sort_keys=False, ensure_ascii=True):
+    """Serialize ``obj`` as JSON to the open text file ``fp``."""
+    fp.write(dumps(obj, indent, sort_keys, ensure_ascii))
+
+
+def loads(text):
+    """Parse a JSON document from a string or bytes."""
+    long_digits = _LONG_DIGITS_BYTES if isinstance(text, (bytes, bytearray)) else _LONG_DIGITS
+    if BACKEND != "json" and not long_digits.search(text):
+        try:
+            return orjson.loads(text) if BACKEND == "orjson" else ujson.loads(text)
+        except (ValueError, OverflowError):
+            # NaN and Infinity are only accepted by the standard library,
+            # which also gives the familiar error messages
+            pass
+    return json.loads(text)
+
+
+def load(fp):
+    """Parse a JSON document from the open file ``fp``."""
+    return loads(fp.read())
@@ -0,0 +1,230 @@
+"""Incremental readers for JSON documents too large to load at once.
+
+Shared by the JSON converters. iter_json_records yields records: a top-level
+array item by item, NDJSON (or any sequence of concatenated JSON values) value
+by value, and any other document as a single value. iter_json_events yields
+parse events for documents whose single top-level value is itself too large.
+"""
+import json
+import json.scanner
+import re
+
+# Characters read from the file per refill
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_non_whitespace = re.compile(r"[^ \t\r\n]")
+# Characters that may continue a number split across two chunks, e.g. "2" + ".5"
+_number_tail = frozenset("0123456789.eE+-")
+
+
+class JsonBuffer(object):
+    """Sliding text window over a file that decodes one JSON value at a time."""
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.data = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.data = self.data[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it, or None at EOF."""
+        while True:
+            match = _non_whitespace.search(self.data, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.data[self.pos]
+            self.pos = len(self.data)
+            if not self.fill():
+                return None
+
+    def advance(self, count=1):
+        self.pos += count
+
+    def decode(self):
+        """Decode the JSON value starting at the current position."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.data, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # Grow geometrically so very large values are not re-parsed per chunk
+                self.fill(max(self.chunk_size, len(self.data) - self.pos))
+                continue
+            if (not self.eof and type(value) in (int, float)
+                    and (end == len(self.data) or self.data[end] in _number_tail) and self.fill()):
+                # A number at the end of the window may continue in the next chunk
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_values(fp, chunk_size=CHUNK_SIZE):
+    """Yield the records of an open JSON or NDJSON text stream."""
+    buffer = JsonBuffer(fp, chunk_size)
+    if buffer.peek() != "[":
+        while buffer.peek() is not None:
+            yield buffer.decode()
+        return
+
+    buffer.advance()
+    if buffer.peek() == "]":
+        buffer.advance()
+    else:
+        while True:
+            yield buffer.decode()
+            separator = buffer.peek()
+            buffer.advance()
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in top-level array, found {separator!r}")
+    if buffer.peek() is not None:
+        raise ValueError("Unexpected data after the top-level array")
+
+
+def iter_json_records(path, chunk_size=CHUNK_SIZE):
+    """Yield the records of a JSON or NDJSON file without loading the whole document."""
+    with open(path, "r", encoding="utf-8") as fp:
+        yield from iter_json_values(fp, chunk_size)
+
+
+def count_json_records(path):
+    """Count the records iter_json_records would yield."""
+    return sum(1 for _ in iter_json_records(path))
+
+
+# Parser states for iter_json_events
+_VALUE, _ARRAY_START, _MAP_START, _MAP_KEY, _AFTER_VALUE = range(5)
+# Next non-whitespace character
+_next_token = re.compile(r"[ \t\r\n]*([^ \t\r\n])")
+# The C scanner behind JSONDecoder.raw_decode, called directly per scalar
+_scan_once = json.scanner.make_scanner(_decoder)
+
+
+def iter_json_events(fp, chunk_size=CHUNK_SIZE):
+    """Yield ``(event, value)`` parse events from an open JSON or NDJSON text stream.
+
+    Events are ``start_map``, ``end_map``, ``start_array``, ``end_array``,
+    ``key`` (value is the key) and ``value`` (value is the scalar). Containers
+    are never materialized, so memory does not depend on the document size.
+    Structural characters are matched here; scalars go through the C scanner.
+    """
+    data = ""
+    pos = 0
+    eof = False
+    containers = []
+    state = _VALUE
+    next_token = _next_token.match
+    scan_once = _scan_once
+
+    while True:
+        match = next_token(data, pos)
+        if match is None:
+            if not eof:
+                chunk = fp.read(chunk_size)
+                if chunk:
+                    data = data[pos:] + chunk
+                    pos = 0
+                else:
+                    eof = True
+                continue
+            char = None
+        else:
+            char = match.group(1)
+            start = match.start(1)
+
+        if state == _AFTER_VALUE:
+            if not containers:
+                if char is None:
+                    return
+                state = _VALUE
+                continue
+            if char is None:
+                raise ValueError("Unexpected end of JSON input")
+            pos = start + 1
+            if char == ",":
+                state = _MAP_KEY if containers[-1] == "map" else _VALUE
+            elif char == "}" and containers[-1] == "map":
+                containers.pop()
+                yield "end_map", None
+            elif char == "]" and containers[-1] == "array":
+                containers.pop()
+                yield "end_array", None
+            else:
+                raise ValueError(f"Unexpected {char!r} after a value")
+            continue
+
+        if char is None:
+            raise ValueError("Unexpected end of JSON input")
+        if char in "{[" and state != _MAP_START and state != _MAP_KEY:
+            pos = start + 1
+            if char == "{":
+                containers.append("map")
+                yield "start_map", None
+                state = _MAP_START
+            else:
+                containers.append("array")
+                yield "start_array", None
+                state = _ARRAY_START
+            continue
+        if (char == "]" and state == _ARRAY_START) or (char == "}" and state == _MAP_START):
+            pos = start + 1
+            containers.pop()
+            yield ("end_array" if char == "]" else "end_map"), None
+            state = _AFTER_VALUE
+            continue
+        if state != _VALUE and state != _ARRAY_START and char != '"':
+            raise ValueError(f"Expected an object key, found {char!r}")
+
+        # Scalar or key: decode it, reading more input while it may be cut off
+        while True:
+            try:
+                value, end = scan_once(data, start)
+            except (StopIteration, json.JSONDecodeError):
+                if eof:
+                    raise ValueError(f"Invalid JSON value at {data[start:start + 20]!r}") from None
+                value = end = None
+            if end is None or (not eof and type(value) in (int, float)
+                               and (end == len(data) or data[end] in _number_tail)):
+                # Grow geometrically so very long strings are not re-scanned per chunk
+                chunk = fp.read(max(chunk_size, len(data) - start))
+                if chunk:
+                    data = data[start:] + chunk
+                    start = 0
+                else:
+                    eof = True
+                continue
+            break
+        pos = end
+
+        if state == _MAP_START or state == _MAP_KEY:
+            match = next_token(data, pos)
+            while match is None and not eof:
+                chunk = fp.read(chunk_size)
+                if chunk:
+                    data = data[pos:] + chunk
+                    pos = 0
+                else:
+                    eof = True
+                match = next_token(data, pos)
+            if match is None or match.group(1) != ":":
+                raise ValueError(f"Expected ':' after key {value!r}")
+            pos = match.end()
+            yield "key", value
+            state = _VALUE
+        else:
+            yield "value", value
+            state = _AFTER_VALUE
@@ -0,0 +1,109 @@
+"""Benchmark the single-pass tree rewriter against per-rule tree walks.
+
+Builds a large Markdown document that uses --shortcodes distinct shortcodes
+and a handful of custom elements, renders it with the previous processors
+(one tree walk per custom element, one regex substitution per shortcode) and
+with the shared TreeRewriter, and reports the time of each, then checks that
+both produce the same HTML.
+
+    python benchmark_shortcodes.py [--shortcodes 500] [--sections 2000]
+"""
+import argparse
+import re
+import time
+
+from markdown.treeprocessors import Treeprocessor
+
+from markdown_to_html import build_markdown
+
+CUSTOM_ELEMENTS = {'blockquote': 'callout', 'h2': 'section-title', 'ul': 'checklist'}
+
+class LegacyCustomHTMLProcessor(Treeprocessor):
+    def __init__(self, md, custom_elements):
+        super().__init__(md)
+        self.custom_elements = custom_elements
+
+    def run(self, root):
+        for element, html in self.custom_elements.items():
+            for node in root.iter():
+                if node.tag == element:
+                    node.tag = 'div'
+                    node.set('class', html)
+
+class LegacyShortcodeProcessor(Treeprocessor):
+    def __init__(self, md, shortcodes):
+        super().__init__(md)
+        self.shortcodes = shortcodes
+
+    def run(self, root):
+        self.process_element(root)
+
+    def process_element(self, element):
+        if element.text:
+            element.text = self.replace_shortcodes(element.text)
+        if element.tail:
+            element.tail = self.replace_shortcodes(element.tail)
+        for child in element:
+            self.process_element(child)
+
+    def replace_shortcodes(self, text):
+        for shortcode, replacement in self.shortcodes.items():
+            text = re.sub(r'\[\[' + re.escape(shortcode) + r'\]\]', replacement, text)
+        return text
+
+def build_legacy_markdown(custom_elements, shortcodes):
+    # The same engine as build_markdown, with the per-rule processors in place of the tree rewriter
+    md = build_markdown()
+    md.treeprocessors.deregister('tree_rewriter')
+    md.treeprocessors.register(LegacyCustomHTMLProcessor(md, custom_elements), 'custom_html', 0)
+    md.treeprocessors.register(LegacyShortcodeProcessor(md, shortcodes), 'shortcodes', 0)
+    return md
+
+def build_shortcodes(count):
+    return {f"code{i}": f"Value {i}" for i in range(count)}
+
+def build_document(sections, shortcode_count):
+    parts = []
+    for i in range(sections):
+        a, b = i % shortcode_count, (i * 7) % shortcode_count
+        parts.append(
+            f"## Section {i}\n\n"
+            f"Paragraph with [[code{a}]] and *emphasis [[code{b}]]* and plain text.\n\n"
+            f"> Quoted [[code{(a + 1) % shortcode_count}]] note\n\n"
+            f"- item one\n- item [[unknown]] two [[code{b}]]\n"
+        )
+    return "\n".join(parts)
+
+def time_render(md, text, repeat):
+    best = None
+    html = None
+    for _ in range(repeat):
+        md.reset()
+        start = time.perf_counter()
+        html = md.convert(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, html
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark custom element and shortcode processing.")
+    parser.add_argument("--shortcodes", type=int, default=500, help="Number of distinct shortcodes defined.")
+    parser.add_argument("--sections", type=int, default=2000, help="Number of sections in the generated document.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine; the fastest is reported.")
+    args = parser.parse_args()
+
+    shortcodes = build_shortcodes(args.shortcodes)
+    text = build_document(args.sections, args.shortcodes)
+    legacy = build_legacy_markdown(CUSTOM_ELEMENTS, shortcodes)
+    single = build_markdown(CUSTOM_ELEMENTS, shortcodes)
+
+    print(f"{len(text) / 1024:.0f} KB of Markdown, {args.shortcodes} shortcodes, {len(CUSTOM_ELEMENTS)} custom elements")
+    print(f"{'engine':<8} {'seconds':>9}")
+    outputs = {}
+    for name, md in (("legacy", legacy), ("single", single)):
+        elapsed, outputs[name] = time_render(md, text, args.repeat)
+        print(f"{name:<8} {elapsed:>9.3f}")
+    print("Outputs identical" if outputs["legacy"] == outputs["single"] else "Outputs DIFFER")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,63 @@
-import markdown
 import os
 import argparse
-import yaml
-from markdown.treeprocessors import Treeprocessor
-from markdown.extensions import Extension
-from markdown.extensions.toc import TocExtension
-from pygments.formatters import HtmlFormatter
-from weasyprint import HTML
+import atexit
 import re
+import hashlib
+import json
+import importlib
 import importlib.util
-from flask import Flask, render_template_string, request
+import queue
+import sys
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+_markdown_import_start = time.perf_counter()
+import markdown
+from markdown.treeprocessors import Treeprocessor
+from markdown.extensions import Extension
+from markdown.extensions.toc import TocExtension
+
+# Seconds spent importing each heavy dependency in this process, reported by
+# --profile-startup. Only Markdown is needed by every run; yaml, pygments,
+# flask and weasyprint are imported by lazy_import() when first used.
+import_times = {'markdown': time.perf_counter() - _markdown_import_start}
+
+def lazy_import(module_name):
+    """Import a heavy dependency on first use, recording how long it took."""
+    module = sys.modules.get(module_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_times[module_name] = time.perf_counter() - start
+    return module
+
+# Heavy dependencies that lazy_import() may load, and what needs them
+LAZY_IMPORTS = {
+    'yaml': 'front matter',
+    'pygments.formatters': 'syntax highlighting',
+    'flask': 'live preview',
+    'weasyprint': 'PDF output',
+    'pypdf': 'PDF book',
+    'PyPDF2': 'PDF book, without pypdf',
+}
+
+def format_import_times():
+    lines = ["Import cost in this process:"]
+    for module_name, seconds in import_times.items():
+        lines.append(f"  {module_name:<22}{seconds * 1000:8.1f} ms")
+    indirect = [name for name in LAZY_IMPORTS if name not in import_times and name in sys.modules]
+    if indirect:
+        lines.append("Loaded by other imports: " + ", ".join(indirect))
+    skipped = [f"{name} ({purpose})" for name, purpose in LAZY_IMPORTS.items() if name not in sys.modules]
+    if skipped:
+        lines.append("Not imported: " + ", ".join(skipped))
+    return "\n".join(lines)
+
+DEFAULT_TITLE = 'Converted Markdown'
 
 class TitleExtractor(Treeprocessor):
     def run(self, root):
@@ -21,19 +68,60 @@ class TitleExtractor(Treeprocessor):
 
 class TitleExtractorExtension(Extension):
     def extendMarkdown(self, md):
+        # Registered so md.reset() clears the title of the previous document
+        md.registerExtension(self)
+        self.md = md
+        md.title = DEFAULT_TITLE
         md.treeprocessors.register(TitleExtractor(md), 'title_extractor', 0)
 
-class CustomHTMLProcessor(Treeprocessor):
-    def __init__(self, md, custom_elements):
+    def reset(self):
+        self.md.title = DEFAULT_TITLE
+
+class TreeRewriter(Treeprocessor):
+    """Applies custom elements and shortcodes in a single walk over the tree.
+
+    Custom elements are looked up by tag in a dict, and all shortcodes are
+    matched by one compiled alternation, so the cost no longer grows with
+    nodes times rules.
+    """
+
+    def __init__(self, md):
         super().__init__(md)
-        self.custom_elements = custom_elements
+        self.custom_elements = {}
+        self.shortcodes = {}
+        self.shortcode_pattern = None
+
+    def add_shortcodes(self, shortcodes):
+        self.shortcodes.update(shortcodes)
+        if self.shortcodes:
+            # Longest first, so no name stops the match at a shorter prefix
+            names = sorted(self.shortcodes, key=len, reverse=True)
+            self.shortcode_pattern = re.compile(r'\[\[(' + '|'.join(map(re.escape, names)) + r')\]\]')
+
+    def replace_shortcode(self, match):
+        return self.shortcodes[match.group(1)]
 
     def run(self, root):
-        for element, html in self.custom_elements.items():
-            for node in root.iter():
-                if node.tag == element:
-                    node.tag = 'div'
-                    node.set('class', html)
+        custom_elements = self.custom_elements
+        pattern = self.shortcode_pattern
+        if not custom_elements and pattern is None:
+            return
+        for node in root.iter():
+            css_class = custom_elements.get(node.tag)
+            if css_class is not None:
+                node.tag = 'div'
+                node.set('class', css_class)
+            if pattern is not None:
+                if node.text and '[[' in node.text:
+                    node.text = pattern.sub(self.replace_shortcode, node.text)
+                if node.tail and '[[' in node.tail:
+                    node.tail = pattern.sub(self.replace_shortcode, node.tail)
+
+def tree_rewriter(md):
+    """Return the engine's shared TreeRewriter, registering it on first use."""
+    if 'tree_rewriter' not in md.treeprocessors:
+        md.treeprocessors.register(TreeRewriter(md), 'tree_rewriter', 0)
+    return md.treeprocessors['tree_rewriter']
 
 class CustomHTMLExtension(Extension):
     def __init__(self, **kwargs):
@@ -41,28 +129,7 @@ class CustomHTMLExtension(Extension):
         super().__init__(**kwargs)
 
     def extendMarkdown(self, md):
-        md.treeprocessors.register(CustomHTMLProcessor(md, self.getConfig('custom_elements')), 'custom_html', 0)
-
-class ShortcodeProcessor(Treeprocessor):
-    def __init__(self, md, shortcodes):
-        super().__init__(md)
-        self.shortcodes = shortcodes
-
-    def run(self, root):
-        self.process_element(root)
-
-    def process_element(self, element):
-        if element.text:
-            element.text = self.replace_shortcodes(element.text)
-        if element.tail:
-            element.tail = self.replace_shortcodes(element.tail)
-        for child in element:
-            self.process_element(child)
-
-    def replace_shortcodes(self, text):
-        for shortcode, replacement in self.shortcodes.items():
-            text = re.sub(r'\[\[' + re.escape(shortcode) + r'\]\]', replacement, text)
-        return text
+        tree_rewriter(md).custom_elements.update(self.getConfig('custom_elements'))
 
 class ShortcodeExtension(Extension):
     def __init__(self, **kwargs):
@@ -70,32 +137,70 @@ class ShortcodeExtension(Extension):
         super().__init__(**kwargs)
 
     def extendMarkdown(self, md):
-        md.treeprocessors.register(ShortcodeProcessor(md, self.getConfig('shortcodes')), 'shortcodes', 0)
+        tree_rewriter(md).add_shortcodes(self.getConfig('shortcodes'))
 
 def extract_metadata(md_text):
     if md_text.startswith('---'):
         end = md_text.find('---', 3)
         if end != -1:
-            metadata = yaml.safe_load(md_text[3:end])
+            metadata = lazy_import('yaml').safe_load(md_text[3:end])
             md_text = md_text[end+3:]
             return metadata, md_text
     return {}, md_text
 
-def convert_markdown_to_html(md_text, inline_css=None, syntax_highlight_style=None, custom_elements=None, shortcodes=None):
+def build_markdown(custom_elements=None, shortcodes=None):
+    # Copies, so later changes to the caller's dicts cannot leak into a pooled engine
     extensions = [
         TitleExtractorExtension(),
         'fenced_code',
         TocExtension(toc_depth="2-3"),
-        CustomHTMLExtension(custom_elements=custom_elements),
-        ShortcodeExtension(shortcodes=shortcodes)
+        CustomHTMLExtension(custom_elements=dict(custom_elements or {})),
+        ShortcodeExtension(shortcodes=dict(shortcodes or {}))
     ]
-    md = markdown.Markdown(extensions=extensions)
-    html = md.convert(md_text)
-    title = getattr(md, 'title', 'Converted Markdown')
+    return markdown.Markdown(extensions=extensions)
+
+# Idle Markdown engines by extension configuration. Building one (extension
+# setup, processor registration) costs far more than converting a typical
+# document, so engines are reused and md.reset() between documents.
+_engine_lock = threading.Lock()
+_idle_engines = {}
+
+def _engine_key(custom_elements, shortcodes):
+    return (tuple(sorted((custom_elements or {}).items())), tuple(sorted((shortcodes or {}).items())))
+
+@contextmanager
+def markdown_engine(custom_elements=None, shortcodes=None):
+    """Borrow a Markdown engine for this configuration, building one if none is idle.
+
+    An engine is used by one thread at a time and is reset when returned.
+    """
+    key = _engine_key(custom_elements, shortcodes)
+    with _engine_lock:
+        idle = _idle_engines.setdefault(key, [])
+        md = idle.pop() if idle else None
+    if md is None:
+        md = build_markdown(custom_elements, shortcodes)
+    try:
+        yield md
+    finally:
+        md.reset()
+        with _engine_lock:
+            _idle_engines[key].append(md)
+
+@lru_cache(maxsize=None)
+def pygments_css(style):
+    formatters = lazy_import('pygments.formatters')
+    return formatters.HtmlFormatter(style=style).get_style_defs('.highlight')
+
+def convert_markdown_to_html(md_text, inline_css=None, syntax_highlight_style=None, custom_elements=None, shortcodes=None):
+    with markdown_engine(custom_elements, shortcodes) as md:
+        html = md.convert(md_text)
+        title = md.title
+        toc = md.toc
     css = f"<style>{inline_css}</style>" if inline_css else ''
 
     if syntax_highlight_style:
-        css += f"<style>{HtmlFormatter(style=syntax_highlight_style).get_style_defs('.highlight')}</style>"
+        css += f"<style>{pygments_css(syntax_highlight_style)}</style>"
 
     return title, f"""
     <!DOCTYPE html>
@@ -107,65 +212,625 @@ def convert_markdown_to_html(md_text, inline_css=None, syntax_highlight_style=No
         {css}
     </head>
     <body>
-        <div class="toc">{md.toc}</div>
+        <div class="toc">{toc}</div>
         {html}
     </body>
     </html>
     """
 
-def load_plugins(plugin_paths):
-    plugins = []
-    for path in plugin_paths:
-        if os.path.isfile(path):
-            spec = importlib.util.spec_from_file_location("plugin", path)
-            plugin = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(plugin)
-            if hasattr(plugin, 'process'):
-                plugins.append(plugin.process)
-    return plugins
+# Plugin outputs kept in memory per process, on top of the optional disk cache
+PLUGIN_MEMORY_CACHE_SIZE = 128
+# Plugin output cache kept in the output directory of a directory-mode build
+PLUGIN_CACHE_NAME = '.markdown_to_html_plugin_cache'
+
+class Plugin(object):
+    """A plugin script's ``process`` function, with its content hash and run statistics."""
+
+    def __init__(self, path, digest, process):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.digest = digest
+        self.process = process
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+class PluginRegistry(object):
+    """Plugins loaded once per process and chained over each page's Markdown.
+
+    Every plugin file is imported under a module name derived from its
+    content hash, so plugins never overwrite each other in sys.modules and a
+    file listed twice is imported only once. The output of each step is cached
+    by (plugin hash, input hash): in memory, and in ``cache_dir`` when given,
+    so slow plugins such as link checkers only run on text they have not
+    seen. This assumes a plugin's output depends only on its input text.
+    """
+
+    def __init__(self, plugin_paths=(), cache_dir=None):
+        self.plugins = []
+        self.cache_dir = cache_dir
+        self.memory = OrderedDict()
+        for path in plugin_paths:
+            if os.path.isfile(path):
+                self.load(path)
+
+    def __len__(self):
+        return len(self.plugins)
+
+    def load(self, path):
+        digest = file_digest(path)
+        module_name = f"markdown_to_html_plugin_{digest[:16]}"
+        module = sys.modules.get(module_name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules[module_name]
+                raise
+        if hasattr(module, 'process'):
+            self.plugins.append(Plugin(path, digest, module.process))
+
+    def cache_path(self, plugin, input_digest):
+        return os.path.join(self.cache_dir, f"{plugin.digest[:16]}-{input_digest}.md")
+
+    def cached_output(self, plugin, key):
+        md_text = self.memory.get(key)
+        if md_text is not None:
+            self.memory.move_to_end(key)
+            return md_text
+        if self.cache_dir is None:
+            return None
+        path = self.cache_path(plugin, key[1])
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                md_text = f.read()
+            # Marks the entry as used by this build, see prune_plugin_cache()
+            os.utime(path)
+        except OSError:
+            return None
+        self.remember(key, md_text)
+        return md_text
+
+    def remember(self, key, md_text):
+        self.memory[key] = md_text
+        if len(self.memory) > PLUGIN_MEMORY_CACHE_SIZE:
+            self.memory.popitem(last=False)
+
+    def store(self, plugin, key, md_text):
+        self.remember(key, md_text)
+        if self.cache_dir is None:
+            return
+        path = self.cache_path(plugin, key[1])
+        # Unique temporary name, since several workers may store the same entry
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(md_text)
+            os.replace(temp_path, path)
+        except OSError:
+            # The cache only saves time; a page never fails because of it
+            pass
+
+    def apply(self, md_text):
+        for plugin in self.plugins:
+            key = (plugin.digest, hashlib.sha256(md_text.encode('utf-8')).hexdigest())
+            cached = self.cached_output(plugin, key)
+            plugin.calls += 1
+            if cached is not None:
+                plugin.hits += 1
+                md_text = cached
+                continue
+            start = time.perf_counter()
+            md_text = plugin.process(md_text)
+            plugin.seconds += time.perf_counter() - start
+            self.store(plugin, key, md_text)
+        return md_text
+
+    def take_stats(self):
+        """Return ``{name: [calls, hits, seconds]}`` since the last call and reset the counters."""
+        stats = {}
+        for plugin in self.plugins:
+            merge_plugin_stats(stats, {plugin.name: [plugin.calls, plugin.hits, plugin.seconds]})
+            plugin.calls = plugin.hits = 0
+            plugin.seconds = 0.0
+        return stats
+
+def load_plugins(plugin_paths, cache_dir=None):
+    return PluginRegistry(plugin_paths, cache_dir)
 
 def apply_plugins(md_text, plugins):
-    for plugin in plugins:
-        md_text = plugin(md_text)
-    return md_text
+    return plugins.apply(md_text) if plugins else md_text
+
+def merge_plugin_stats(total, stats):
+    for name, (calls, hits, seconds) in stats.items():
+        entry = total.setdefault(name, [0, 0, 0.0])
+        entry[0] += calls
+        entry[1] += hits
+        entry[2] += seconds
+    return total
+
+def prune_plugin_cache(cache_dir, before):
+    """Delete plugin cache entries not written or read since ``before`` (a timestamp)."""
+    removed = 0
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return removed
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            if os.stat(path).st_mtime < before:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    try:
+        os.rmdir(cache_dir)
+    except OSError:
+        # Not empty
+        pass
+    return removed
+
+def format_plugin_profile(stats):
+    lines = ["Plugin time:", f"  {'plugin':<24}{'calls':>7}{'cached':>8}{'total s':>10}{'ms/run':>9}"]
+    if not stats:
+        lines.append("  (no plugins ran)")
+    for name, (calls, hits, seconds) in sorted(stats.items(), key=lambda item: -item[1][2]):
+        runs = calls - hits
+        per_run = seconds / runs * 1000 if runs else 0.0
+        lines.append(f"  {name:<24}{calls:>7}{hits:>8}{seconds:>10.3f}{per_run:>9.1f}")
+    return "\n".join(lines)
+
+def build_page(md_text, css_content=None, syntax_highlight_style=None, custom_elements=None, shortcodes=None,
+               plugins=None, extra_metadata=None, template=None):
+    """Turn one Markdown document into a full HTML page.
+
+    Strips the YAML front matter, runs ``plugins`` (a PluginRegistry),
+    converts, and fills ``{{content}}`` and ``{{metadata}}`` in ``template``
+    when one is given.
+    """
+    metadata, md_text = extract_metadata(md_text)
+    metadata = dict(metadata or {})
+    metadata.update(extra_metadata or {})
+    md_text = apply_plugins(md_text, plugins)
+    title, full_html = convert_markdown_to_html(md_text, css_content, syntax_highlight_style, custom_elements, shortcodes)
+
+    if template is not None:
+        metadata_html = "\n".join([f'<meta name="{k}" content="{v}">' for k, v in metadata.items()])
+        full_html = template.replace("{{content}}", full_html).replace("{{metadata}}", metadata_html)
+    return full_html
+
+def pdf_render_settings(css_content=None, syntax_highlight_style=None):
+    """Parse the page CSS once into weasyprint objects to reuse for every PDF.
+
+    The user CSS and the highlight stylesheet become a single ``CSS`` object,
+    and one ``FontConfiguration`` keeps loaded fonts across documents.
+    """
+    weasyprint = lazy_import('weasyprint')
+    font_config = lazy_import('weasyprint.text.fonts').FontConfiguration()
+    css_text = (css_content or '') + (pygments_css(syntax_highlight_style) if syntax_highlight_style else '')
+    stylesheets = [weasyprint.CSS(string=css_text, font_config=font_config)] if css_text else []
+    return {'stylesheets': stylesheets, 'font_config': font_config}
+
+def write_output(full_html, output_file, stylesheets=None, font_config=None, base_url=None):
+    if output_file.endswith('.pdf'):
+        document = lazy_import('weasyprint').HTML(string=full_html, base_url=base_url)
+        document.write_pdf(output_file, stylesheets=stylesheets, font_config=font_config)
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(full_html)
+
+def find_markdown_files(source_dir):
+    """Yield the Markdown files under source_dir in a stable, sorted order."""
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(('.md', '.markdown')):
+                yield os.path.join(dirpath, name)
+
+def mirrored_output_path(source_path, source_dir, output_dir, extension):
+    relative = os.path.relpath(source_path, source_dir)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + extension)
+
+# Page options and plugins set once per pool worker; the Markdown engines
+# those workers use are pooled per process by markdown_engine()
+_worker_options = None
+_worker_plugins = None
+_worker_pdf_settings = {}
+
+def _init_site_worker(options, plugin_paths, output_format='html', plugin_cache_dir=None):
+    global _worker_options, _worker_plugins, _worker_pdf_settings
+    _worker_options = options
+    _worker_plugins = load_plugins(plugin_paths, plugin_cache_dir)
+    if output_format == 'pdf':
+        # The page CSS goes in as pre-parsed stylesheets instead of a <style>
+        # block that weasyprint would parse again for every document
+        _worker_pdf_settings = pdf_render_settings(options.get('css_content'), options.get('syntax_highlight_style'))
+        _worker_options = dict(options, css_content=None, syntax_highlight_style=None)
+
+def _convert_site_page(source_path, output_path):
+    try:
+        with open(source_path, 'r', encoding='utf-8') as f:
+            md_text = f.read()
+        full_html = build_page(md_text, plugins=_worker_plugins, **_worker_options)
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        base_url = os.path.dirname(os.path.abspath(source_path))
+        write_output(full_html, output_path, base_url=base_url, **_worker_pdf_settings)
+    except Exception as e:
+        return source_path, 0, f"{type(e).__name__}: {e}", _worker_plugins.take_stats()
+    return source_path, len(md_text.encode('utf-8')), None, _worker_plugins.take_stats()
+
+# Build manifest kept in the output directory of a directory-mode build
+MANIFEST_NAME = '.markdown_to_html_manifest.json'
+# Bump when the manifest layout or page pipeline changes so old builds are redone
+MANIFEST_VERSION = 1
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def config_digest(options, plugin_paths, output_format):
+    """Hash everything besides the source that shapes a page.
+
+    Covers the option set (including the CSS and template text), the plugin
+    files' contents and the output format, plus the Markdown version.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([MANIFEST_VERSION, markdown.__version__, output_format, options], sort_keys=True, default=str).encode('utf-8'))
+    for path in plugin_paths:
+        digest.update(os.path.abspath(path).encode('utf-8'))
+        digest.update(file_digest(path).encode('ascii'))
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('pages', {})
+
+def save_manifest(manifest_path, pages):
+    # Written to a temporary file first so an interrupted build keeps the old manifest
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'pages': pages}, f, indent=1, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def remove_output(output_path, output_dir):
+    """Delete a stale output file and any directories it leaves empty."""
+    try:
+        os.remove(output_path)
+    except FileNotFoundError:
+        return False
+    parent = os.path.dirname(output_path)
+    root = os.path.abspath(output_dir)
+    while os.path.abspath(parent).startswith(root + os.sep):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+    return True
+
+def convert_site(source_dir, output_dir, options, plugin_paths=(), output_format='html', workers=None, progress_callback=None, incremental=True):
+    """Convert every Markdown file under source_dir, mirroring the tree into output_dir.
+
+    ``options`` holds the build_page keyword arguments shared by all pages.
+    Pages are spread over ``workers`` processes (default: one per core); each
+    worker loads the plugins once and reuses its Markdown engines across pages.
+    A page that fails is reported and does not stop the build.
+
+    With ``incremental``, a manifest in output_dir records each page's source
+    hash and the config_digest it was built with. Only pages whose inputs
+    changed are rendered, and outputs of sources that no longer exist are
+    deleted.
+
+    Plugin output is cached in a directory inside output_dir, so plugins only
+    run on text they have not processed before, even in a full rebuild. A
+    full rebuild also drops the cache entries it did not use.
+
+    ``progress_callback(done, total, source_path, error)`` is called per page.
+    Returns ``{"pages", "unchanged", "removed", "failed", "bytes", "seconds",
+    "outputs", "plugins"}`` with failed as (path, error) pairs, outputs listing
+    every up-to-date output in source order and plugins holding the
+    merge_plugin_stats() totals of all workers.
+    """
+    start = time.perf_counter()
+    wall_start = time.time()
+    extension = '.pdf' if output_format == 'pdf' else '.html'
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    old_pages = load_manifest(manifest_path) if incremental else {}
+    config = config_digest(options, plugin_paths, output_format)
+    plugin_cache_dir = os.path.join(output_dir, PLUGIN_CACHE_NAME)
+    worker_args = (options, plugin_paths, output_format, plugin_cache_dir if plugin_paths else None)
+    summary = {"pages": 0, "unchanged": 0, "removed": 0, "failed": [], "bytes": 0, "seconds": 0.0, "plugins": {}}
+
+    pages = {}
+    pending = {}
+    order = []
+    ready = set()
+    for source_path in find_markdown_files(source_dir):
+        output_path = mirrored_output_path(source_path, source_dir, output_dir, extension)
+        key = os.path.relpath(source_path, source_dir).replace(os.sep, '/')
+        entry = {'source': file_digest(source_path), 'config': config,
+                 'output': os.path.relpath(output_path, output_dir).replace(os.sep, '/')}
+        order.append(key)
+        if old_pages.get(key) == entry and os.path.exists(output_path):
+            pages[key] = entry
+            ready.add(key)
+            summary["unchanged"] += 1
+        else:
+            pending[source_path] = (key, entry, output_path)
+
+    def remove_stale(key):
+        entry = old_pages.get(key)
+        if isinstance(entry, dict) and entry.get('output') not in current_outputs:
+            if remove_output(os.path.join(output_dir, entry['output']), output_dir):
+                summary["removed"] += 1
+
+    # Outputs of deleted sources go now; an output written under another name
+    # (e.g. after switching to PDF) goes once its replacement has been built
+    current_outputs = {entry['output'] for _, entry, _ in pending.values()} | {entry['output'] for entry in pages.values()}
+    current_keys = {key for key, _, _ in pending.values()} | set(pages)
+    for key in old_pages:
+        if key not in current_keys:
+            remove_stale(key)
+
+    sources = list(pending)
+    outputs = [pending[path][2] for path in sources]
+    workers = min(workers or os.cpu_count() or 1, len(sources)) or 1
+
+    def record(done, result):
+        source_path, size, error, plugin_stats = result
+        key, entry, _ = pending[source_path]
+        merge_plugin_stats(summary["plugins"], plugin_stats)
+        if error:
+            summary["failed"].append((source_path, error))
+            # The previous output stays tracked; its old entry no longer
+            # matches, so the next build retries the page
+            if key in old_pages:
+                pages[key] = old_pages[key]
+        else:
+            pages[key] = entry
+            ready.add(key)
+            remove_stale(key)
+            summary["pages"] += 1
+            summary["bytes"] += size
+        if progress_callback:
+            progress_callback(done, len(sources), source_path, error)
+
+    if sources and workers == 1:
+        _init_site_worker(*worker_args)
+        for done, (source_path, output_path) in enumerate(zip(sources, outputs), start=1):
+            record(done, _convert_site_page(source_path, output_path))
+    elif sources:
+        # Small pages are handed out in batches to keep inter-process traffic low
+        chunksize = max(1, min(64, len(sources) // (workers * 8)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_site_worker, initargs=worker_args) as executor:
+            for done, result in enumerate(executor.map(_convert_site_page, sources, outputs, chunksize=chunksize), start=1):
+                record(done, result)
+
+    os.makedirs(output_dir, exist_ok=True)
+    save_manifest(manifest_path, pages)
+    if not summary["unchanged"] and not summary["failed"]:
+        # Every page went through the plugins, so untouched entries are dead.
+        # File times come from a coarser clock than time.time(), hence the slack.
+        prune_plugin_cache(plugin_cache_dir, wall_start - 2)
+    summary["outputs"] = [os.path.join(output_dir, pages[key]['output']) for key in order if key in ready]
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+def load_pdf_library():
+    """Return pypdf, or PyPDF2 when it is recent enough, for merge_pdf_book."""
+    for module_name in ('pypdf', 'PyPDF2'):
+        try:
+            module = lazy_import(module_name)
+        except ImportError:
+            continue
+        # PyPDF2 before 3.0 has no PdfWriter.append; 3.0 rejects the old merger API
+        if hasattr(module.PdfWriter, 'append') and not module.__version__.startswith(('1.', '2.')):
+            return module
+    raise RuntimeError("--book needs pypdf (pip install pypdf) or PyPDF2 3.0 or later.")
+
+def merge_pdf_book(pdf_paths, book_path):
+    """Concatenate page PDFs into one book PDF.
+
+    Each page gets a top-level bookmark named after its document title, next
+    to the heading bookmarks weasyprint wrote for its table of contents.
+    """
+    pdf = load_pdf_library()
+    writer = pdf.PdfWriter()
+    for path in pdf_paths:
+        reader = pdf.PdfReader(path)
+        metadata = reader.metadata
+        title = (metadata.title if metadata else None) or os.path.splitext(os.path.basename(path))[0]
+        writer.append(reader, outline_item=title, import_outline=True)
+    with open(book_path, 'wb') as book:
+        writer.write(book)
+
+def format_site_summary(summary):
+    seconds = summary["seconds"] or 1e-9
+    lines = [
+        f"Converted {summary['pages']} pages in {summary['seconds']:.2f}s "
+        f"({summary['pages'] / seconds:.1f} pages/s, {summary['bytes'] / seconds / (1024 * 1024):.2f} MB/s of Markdown)"
+    ]
+    if summary["unchanged"] or summary["removed"]:
+        lines.append(f"{summary['unchanged']} pages unchanged, {summary['removed']} stale outputs removed")
+    if summary["failed"]:
+        lines.append(f"{len(summary['failed'])} pages failed:")
+        lines.extend(f"  {path}: {error}" for path, error in summary["failed"])
+    return "\n".join(lines)
 
 def validate_file_path(file_path, description, must_exist=True):
     if must_exist and not os.path.isfile(file_path):
         raise argparse.ArgumentTypeError(f"{description} '{file_path}' does not exist.")
     return file_path
 
-app = Flask(__name__)
+def validate_source_path(path):
+    if not os.path.isfile(path) and not os.path.isdir(path):
+        raise argparse.ArgumentTypeError(f"Markdown file or directory '{path}' does not exist.")
+    return path
+
+# Seconds between checks of the previewed file for changes
+PREVIEW_POLL_INTERVAL = 0.3
+# Seconds between keep-alive comments on an idle event stream
+SSE_KEEPALIVE = 15
+# Injected into preview pages: swaps in each page pushed over /events
+LIVE_RELOAD_SCRIPT = """<script>
+new EventSource('/events').onmessage = function (event) {
+    var page = new DOMParser().parseFromString(JSON.parse(event.data), 'text/html');
+    document.title = page.title;
+    document.head.replaceWith(page.head);
+    document.body.replaceWith(page.body);
+};
+</script>"""
+
+class PreviewCache(object):
+    """Rendered live-preview page for one Markdown file.
+
+    refresh() compares the file's mtime and size first and its content hash
+    second, so the page is re-rendered only when the text really changed.
+    Each new page is pushed to every subscribed event stream.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stat_key = None
+        self.digest = None
+        self.html = None
+        self.subscribers = set()
+
+    def refresh(self):
+        with self.lock:
+            try:
+                stat = os.stat(self.path)
+                stat_key = (stat.st_mtime_ns, stat.st_size)
+                if stat_key == self.stat_key:
+                    return False
+                with open(self.path, 'rb') as file:
+                    data = file.read()
+                self.stat_key = stat_key
+                digest = hashlib.sha256(data).hexdigest()
+                if digest == self.digest:
+                    return False
+                html = render_preview_page(data.decode('utf-8'))
+            except Exception as e:
+                # Shown in the open tabs until the next successful render
+                self.stat_key = self.digest = None
+                html = f"<pre>Error rendering {self.path}: {e}</pre>{LIVE_RELOAD_SCRIPT}"
+                digest = None
+            if html == self.html:
+                return False
+            self.digest = digest
+            self.html = html
+            subscribers = list(self.subscribers)
+        for updates in subscribers:
+            updates.put(html)
+        return True
+
+    def subscribe(self):
+        updates = queue.Queue()
+        with self.lock:
+            self.subscribers.add(updates)
+        return updates
+
+    def unsubscribe(self, updates):
+        with self.lock:
+            self.subscribers.discard(updates)
+
+def render_preview_page(md_text):
+    metadata, md_text = extract_metadata(md_text)
+    md_text = apply_plugins(md_text, plugins)
+    title, html_content = convert_markdown_to_html(md_text, css_content, syntax_highlight_style, custom_elements, shortcodes)
+    end = html_content.rfind('</body>')
+    if end == -1:
+        return html_content + LIVE_RELOAD_SCRIPT
+    return html_content[:end] + LIVE_RELOAD_SCRIPT + html_content[end:]
+
+def watch_preview(cache, interval=PREVIEW_POLL_INTERVAL):
+    # Polling a single file's stat is cheap and needs no watcher dependency
+    while True:
+        time.sleep(interval)
+        cache.refresh()
+
 md_file_path = None
 css_content = None
 syntax_highlight_style = None
 custom_elements = None
 shortcodes = None
-plugins = []
-
-@app.route('/')
-def index():
-    if not md_file_path:
-        return "Markdown file not specified."
-    try:
-        with open(md_file_path, 'r', encoding='utf-8') as file:
-            md_text = file.read()
-    except Exception as e:
-        return f"Error reading {md_file_path}: {e}"
-
-    metadata, md_text = extract_metadata(md_text)
-    md_text = apply_plugins(md_text, plugins)
-    title, html_content = convert_markdown_to_html(md_text, css_content, syntax_highlight_style, custom_elements, shortcodes)
-    return render_template_string(html_content)
+plugins = None
+preview_cache = None
+app = None
+
+def get_app():
+    """Build the live-preview Flask app on first use, so other runs never import Flask."""
+    global app
+    if app is not None:
+        return app
+    flask = lazy_import('flask')
+    app = flask.Flask(__name__)
+
+    @app.route('/')
+    def index():
+        if preview_cache is None:
+            return "Markdown file not specified."
+        if preview_cache.html is None:
+            preview_cache.refresh()
+        # Served as-is: the page is already HTML and must not go through Jinja
+        response = flask.Response(preview_cache.html, mimetype='text/html')
+        if preview_cache.digest:
+            response.set_etag(preview_cache.digest)
+        return response.make_conditional(flask.request)
+
+    @app.route('/events')
+    def events():
+        cache = preview_cache
+        if cache is None:
+            return flask.Response(status=404)
+        updates = cache.subscribe()
+
+        def stream():
+            try:
+                # Sent at once so the connection opens without waiting for a change;
+                # also tells the browser how soon to reconnect if the server restarts
+                yield "retry: 1000\n\n"
+                while True:
+                    try:
+                        html = updates.get(timeout=SSE_KEEPALIVE)
+                    except queue.Empty:
+                        yield ": keepalive\n\n"
+                        continue
+                    # Only the newest page matters to a tab that fell behind
+                    while not updates.empty():
+                        html = updates.get_nowait()
+                    yield f"data: {json.dumps(html)}\n\n"
+            finally:
+                cache.unsubscribe(updates)
+
+        return flask.Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    return app
 
 def run_server():
-    app.run(debug=True, use_reloader=False)
+    get_app().run(debug=True, use_reloader=False, threaded=True)
 
 def main():
-    global md_file_path, css_content, syntax_highlight_style, custom_elements, shortcodes, plugins
+    global md_file_path, css_content, syntax_highlight_style, custom_elements, shortcodes, plugins, preview_cache
 
     parser = argparse.ArgumentParser(description="Convert Markdown to HTML or PDF.")
-    parser.add_argument("markdown_file", type=lambda x: validate_file_path(x, "Markdown file"), help="Path to the Markdown file to convert.")
-    parser.add_argument("output_file", help="Path to save the output file (HTML or PDF).")
+    parser.add_argument("markdown_file", type=validate_source_path, help="Markdown file to convert, or a directory to convert every .md file in.")
+    parser.add_argument("output_file", help="Path to save the output file (HTML or PDF), or the output directory in directory mode.")
     parser.add_argument("--css", type=lambda x: validate_file_path(x, "CSS file"), help="Optional CSS file to link in the HTML.", default=None)
     parser.add_argument("--inline-css", help="Optional inline CSS styles to include in the HTML.", default=None)
     parser.add_argument("--syntax-highlight", help="Syntax highlight style (default: default).", default="default")
@@ -175,23 +840,40 @@ def main():
     parser.add_argument("--shortcodes", help="Shortcodes in 'shortcode:replacement' format.", nargs='*', default=None)
     parser.add_argument("--plugins", type=lambda x: validate_file_path(x, "Plugin file"), help="Paths to custom plugin scripts.", nargs='*', default=None)
     parser.add_argument("--live-preview", action='store_true', help="Enable live preview server.")
+    parser.add_argument("--format", choices=["html", "pdf"], default="html", help="Output format in directory mode (default: html).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes in directory mode (default: one per CPU core).")
+    parser.add_argument("--force", action='store_true', help="Rebuild every page in directory mode instead of only the changed ones.")
+    parser.add_argument("--book", help="In directory mode, also merge the PDF pages into one book PDF at this path (implies --format pdf).")
+    parser.add_argument("--profile-startup", action='store_true', help="Report how long each heavy import took in this run.")
+    parser.add_argument("--profile", action='store_true', help="Report the time spent in each plugin and how often its cached output was reused.")
     args = parser.parse_args()
 
-    try:
-        with open(args.markdown_file, 'r', encoding='utf-8') as file:
-            md_file_path = args.markdown_file
-    except Exception as e:
-        print(f"Error reading {args.markdown_file}: {e}")
+    if args.profile_startup:
+        atexit.register(lambda: print(format_import_times(), file=sys.stderr))
+
+    site_mode = os.path.isdir(args.markdown_file)
+    if site_mode and args.live_preview:
+        print("Live preview needs a single Markdown file, not a directory.")
         exit(1)
+    if args.book:
+        # Checked before any page is rendered
+        try:
+            load_pdf_library()
+        except RuntimeError as e:
+            print(e)
+            exit(1)
+    md_file_path = args.markdown_file
 
-    metadata, _ = extract_metadata(md_file_path)
+    extra_metadata = {}
     if args.metadata:
         for item in args.metadata:
             key, value = item.split(':')
-            metadata[key.strip()] = value.strip()
+            extra_metadata[key.strip()] = value.strip()
 
     if args.plugins:
         plugins = load_plugins(args.plugins)
+    if args.profile and not site_mode:
+        atexit.register(lambda: print(format_plugin_profile(plugins.take_stats() if plugins else {}), file=sys.stderr))
 
     custom_elements = {}
     if args.custom_elements:
@@ -206,6 +888,7 @@ def main():
             shortcodes[shortcode.strip()] = replacement.strip()
 
     css_content = args.inline_css
+    syntax_highlight_style = args.syntax_highlight
 
     if args.css:
         try:
@@ -216,34 +899,63 @@ def main():
             exit(1)
 
     if args.live_preview:
+        preview_cache = PreviewCache(md_file_path)
+        preview_cache.refresh()
+        threading.Thread(target=watch_preview, args=(preview_cache,), daemon=True).start()
+        get_app()
         server_thread = threading.Thread(target=run_server)
         server_thread.start()
         print(f"Live preview server started at http://127.0.0.1:5000")
         return
 
-    title, full_html = convert_markdown_to_html(md_file_path, css_content, args.syntax_highlight, custom_elements, shortcodes)
-
-    metadata_html = "\n".join([f'<meta name="{k}" content="{v}">' for k, v in metadata.items()])
-
+    template = None
     if args.template:
         try:
             with open(args.template, 'r', encoding='utf-8') as template_file:
                 template = template_file.read()
-                full_html = template.replace("{{content}}", full_html).replace("{{metadata}}", metadata_html)
         except Exception as e:
             print(f"Error reading template file {args.template}: {e}")
             exit(1)
 
-    if args.output_file.endswith('.pdf'):
-        HTML(string=full_html).write_pdf(args.output_file)
-    else:
-        try:
-            with open(args.output_file, 'w', encoding='utf-8') as output_file:
-                output_file.write(full_html)
-            print(f"Converted HTML saved to {args.output_file}")
-        except Exception as e:
-            print(f"Error saving output file {args.output_file}: {e}")
+    options = {
+        "css_content": css_content,
+        "syntax_highlight_style": syntax_highlight_style,
+        "custom_elements": custom_elements,
+        "shortcodes": shortcodes,
+        "extra_metadata": extra_metadata,
+        "template": template,
+    }
+
+    if site_mode:
+        output_format = 'pdf' if args.book else args.format
+        summary = convert_site(args.markdown_file, args.output_file, options, args.plugins or (), output_format, args.workers,
+                               incremental=not args.force)
+        print(format_site_summary(summary))
+        if args.profile:
+            print(format_plugin_profile(summary["plugins"]), file=sys.stderr)
+        if args.book and summary["outputs"]:
+            start = time.perf_counter()
+            merge_pdf_book(summary["outputs"], args.book)
+            print(f"Merged {len(summary['outputs'])} pages into {args.book} in {time.perf_counter() - start:.2f}s")
+        if summary["failed"]:
             exit(1)
+        return
+
+    try:
+        with open(args.markdown_file, 'r', encoding='utf-8') as file:
+            md_text = file.read()
+    except Exception as e:
+        print(f"Error reading {args.markdown_file}: {e}")
+        exit(1)
+
+    full_html = build_page(md_text, plugins=plugins, **options)
+
+    try:
+        write_output(full_html, args.output_file)
+        print(f"Converted output saved to {args.output_file}")
+    except Exception as e:
+        print(f"Error saving output file {args.output_file}: {e}")
+        exit(1)
 
 if __name__ == "__main__":
     main()
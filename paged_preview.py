@@ -0,0 +1,141 @@
+"""Paged preview window shared by the data converters.
+
+Records come from a lazy iterator and are rendered one page at a time as the
+user scrolls, so opening a preview of a huge file costs one page of work. The
+total record count is computed on a background thread and handed back to Tk
+through a queue, since Tk widgets may only be touched from the main thread.
+"""
+import queue
+import threading
+import tkinter as tk
+
+import json_codec
+
+# Records rendered per page
+PAGE_SIZE = 50
+# How often (ms) the window checks for the background count result
+COUNT_POLL_MS = 200
+
+
+def render_json(record):
+    return json_codec.dumps(record, indent=4)
+
+
+class PagedPreview(object):
+    """Toplevel window that renders records from ``open_records()`` page by page.
+
+    ``open_records`` returns a fresh iterator of records. ``count_records``, if
+    given, returns the total number of records and runs off the main thread.
+    ``render`` turns one record into text (pretty-printed JSON by default).
+    """
+
+    def __init__(self, parent, title, open_records, count_records=None, render=render_json, page_size=PAGE_SIZE, geometry="500x300"):
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry(geometry)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.status = tk.Label(self.window, anchor="w")
+        self.status.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.scrollbar = tk.Scrollbar(self.window)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.text_area = tk.Text(self.window, wrap=tk.WORD, yscrollcommand=self.on_scroll)
+        self.text_area.pack(expand=True, fill=tk.BOTH)
+        self.text_area.config(state=tk.DISABLED)
+        self.scrollbar.config(command=self.text_area.yview)
+
+        self.records = open_records()
+        self.render = render
+        self.page_size = page_size
+        self.shown = 0
+        self.total = None
+        self.counting = count_records is not None
+        self.exhausted = False
+        self.loading = False
+        self.results = queue.Queue()
+        # Pending after() callbacks, cancelled when the preview is closed
+        self.poll_id = None
+        self.load_id = None
+
+        self.load_page()
+        if count_records is not None:
+            threading.Thread(target=self.count_in_background, args=(count_records,), daemon=True).start()
+            self.poll_id = self.window.after(COUNT_POLL_MS, self.poll_count)
+
+    def load_page(self):
+        self.load_id = None
+        if self.exhausted or self.loading or not self.window.winfo_exists():
+            return
+        self.loading = True
+        try:
+            lines = []
+            for _ in range(self.page_size):
+                try:
+                    record = next(self.records)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+                lines.append(self.render(record))
+            if lines:
+                self.text_area.config(state=tk.NORMAL)
+                self.text_area.insert(tk.END, "\n".join(lines) + "\n")
+                self.text_area.config(state=tk.DISABLED)
+                self.shown += len(lines)
+        except Exception as e:
+            self.exhausted = True
+            self.text_area.config(state=tk.NORMAL)
+            self.text_area.insert(tk.END, f"\nPreview stopped: {e}\n")
+            self.text_area.config(state=tk.DISABLED)
+        finally:
+            self.loading = False
+        self.update_status()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Fetch the next page once the view nears the end of what is rendered
+        if float(last) >= 0.95 and not self.exhausted and self.load_id is None:
+            self.load_id = self.window.after_idle(self.load_page)
+
+    def count_in_background(self, count_records):
+        try:
+            self.results.put(count_records())
+        except Exception as e:
+            self.results.put(e)
+
+    def poll_count(self):
+        self.poll_id = None
+        # The window may have been destroyed with its parent
+        if not self.window.winfo_exists():
+            return
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            self.poll_id = self.window.after(COUNT_POLL_MS, self.poll_count)
+            return
+        self.counting = False
+        if not isinstance(result, Exception):
+            self.total = result
+        self.update_status()
+
+    def update_status(self):
+        if self.total is not None:
+            text = f"Showing {self.shown:,} of {self.total:,} records"
+        elif self.counting:
+            text = f"Showing {self.shown:,} records (counting...)"
+        else:
+            text = f"Showing {self.shown:,} records"
+        if not self.exhausted:
+            text += " - scroll down for more"
+        self.status.config(text=text)
+
+    def close(self):
+        for after_id in (self.poll_id, self.load_id):
+            if after_id is not None:
+                self.window.after_cancel(after_id)
+        self.poll_id = self.load_id = None
+        close = getattr(self.records, "close", None)
+        if close:
+            close()
+        self.window.destroy()
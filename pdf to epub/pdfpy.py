@@ -1,8 +1,12 @@
-import pdfkit
 import os
+import sys
 from PyPDF2 import PdfFileMerger
 from PyPDF2.utils import PdfReadError
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from asset_cache import AssetCache, format_asset_summary
+from html_pdf import HtmlPdfService
+
 
 class PdfEngine(object):
 
@@ -12,7 +16,9 @@ class PdfEngine(object):
 		It has the following methods:
 
 		convert() --- Which converts each of the markup file
-		passed in to pdf. Markup file should be html
+		passed in to pdf. Markup file should be html. Stylesheets,
+		fonts and images shared by the sections are read once,
+		through the asset cache.
 
 		combine() --- Which merges all of the pdf files created by
 		the convert method, creating a new file.
@@ -29,14 +35,15 @@ class PdfEngine(object):
 		self.directory = directory
 
 	def convert(self):
-		for each in self.markup_files:
+		jobs = [(each, "{}.pdf".format(index)) for index, each in enumerate(self.markup_files)]
 
-			# Prevent conversion process from showing terminal updates
-			options = {"enable-local-file-access": None, "quiet": ""}
-			pdfkit.from_file(each, "{}.pdf".format(self.markup_files.index(each)),
-							 options=options)
+		with AssetCache() as cache, HtmlPdfService(asset_cache=cache) as service:
+			summary = service.render_files(jobs)
 
+		for pdf, error in summary["failed"]:
+			print('--- Could not convert {}: {}'.format(pdf, error))
 		print('--- Sections converted to pdf')
+		print('--- ' + format_asset_summary(summary["assets"]))
 
 	def combine(self):
 
@@ -0,0 +1,77 @@
+"""Measure the Word to PDF window's time to first window, before and after the font cache.
+
+"before" reproduces the previous startup, which fetched the Google Fonts
+stylesheet with a blocking request before building the window. "cold" is the
+current startup with an empty font cache and "warm" with a filled one; both
+load the font in the background. Every run is a fresh process and the median
+of --runs is reported.
+
+    python benchmark_startup.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+LEGACY_STARTUP = '''
+import time
+start = time.perf_counter()
+import requests
+import word_to_pdf_gui
+
+def fetch_google_font(font_name):
+    font_url = f"https://fonts.googleapis.com/css2?family={font_name.replace(' ', '+')}&display=swap"
+    try:
+        response = requests.get(font_url)
+        response.raise_for_status()
+        with open(f"{font_name.replace(' ', '_')}.css", "w") as f:
+            f.write(response.text)
+        return True
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch Google Font: {e}")
+        return False
+
+fetch_google_font("Poppins")
+app = word_to_pdf_gui.WordToPDFConverter()
+app.update()
+print(f"Time to first window: {(time.perf_counter() - start) * 1000:.0f} ms")
+app.destroy()
+'''
+
+def time_to_first_window(command, cache_dir, work_dir):
+    env = dict(os.environ, XDG_CACHE_HOME=cache_dir, PYTHONPATH=HERE)
+    output = subprocess.run(command, cwd=work_dir, env=env, capture_output=True, text=True, check=True).stdout
+    line = next(line for line in output.splitlines() if line.startswith("Time to first window:"))
+    return float(line.split(":")[1].split()[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first window of word_to_pdf_gui.py.")
+    parser.add_argument("--runs", type=int, default=5, help="Launches per variant; the median is reported.")
+    args = parser.parse_args()
+
+    gui = [sys.executable, os.path.join(HERE, "word_to_pdf_gui.py"), "--startup-timing"]
+    print(f"{'variant':<8} {'median ms':>10}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        variants = (
+            ("before", [sys.executable, "-c", LEGACY_STARTUP], False),
+            ("cold", gui, False),
+            ("warm", gui, True),
+        )
+        for name, command, warm in variants:
+            times = []
+            for _ in range(args.runs):
+                with tempfile.TemporaryDirectory() as cache_dir:
+                    if warm:
+                        # Fill the cache the way a first launch would
+                        subprocess.run([sys.executable, "-c", "import word_to_pdf_gui as g; g.fetch_google_font(g.FONT_FAMILY)"],
+                                       cwd=work_dir, env=dict(os.environ, XDG_CACHE_HOME=cache_dir, PYTHONPATH=HERE),
+                                       capture_output=True, check=True)
+                    times.append(time_to_first_window(command, cache_dir, work_dir))
+            print(f"{name:<8} {statistics.median(times):>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Headless Word to PDF batch conversion, used by word_to_pdf_gui.py.
+
+Documents are converted with docx2pdf (Microsoft Word, on Windows and macOS)
+or with LibreOffice in headless mode where docx2pdf is not available. Up to
+--workers LibreOffice processes run at once, each with its own profile (two
+instances cannot share one) and each converting a batch of documents, since
+starting LibreOffice costs more than converting a short document. Word is a
+single application instance, so docx2pdf converts one document at a time.
+
+    python word_to_pdf.py contracts/ -o pdf/ [--workers 8] [--backend libreoffice]
+"""
+import argparse
+import os
+import pathlib
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_pdf import count_pdf_pages
+
+BACKENDS = ("docx2pdf", "libreoffice")
+WORD_EXTENSIONS = (".docx",)
+# Where the installers put LibreOffice, tried when it is not on PATH
+LIBREOFFICE_PATHS = (
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+)
+# Documents converted per LibreOffice process
+LIBREOFFICE_BATCH_SIZE = 10
+# Seconds a single document may take before its converter is killed
+DOCUMENT_TIMEOUT = 300
+
+
+def find_libreoffice():
+    """Return the LibreOffice executable ($LIBREOFFICE, then PATH), or None."""
+    path = os.environ.get("LIBREOFFICE") or shutil.which("soffice") or shutil.which("libreoffice")
+    if path:
+        return path
+    return next((path for path in LIBREOFFICE_PATHS if os.path.isfile(path)), None)
+
+
+def docx2pdf_available():
+    # docx2pdf drives Microsoft Word, which only exists on Windows and macOS
+    if sys.platform not in ("win32", "darwin"):
+        return False
+    try:
+        import docx2pdf  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def default_backend():
+    if docx2pdf_available():
+        return "docx2pdf"
+    if find_libreoffice():
+        return "libreoffice"
+    raise RuntimeError("No Word to PDF converter found: install docx2pdf (with Microsoft Word) or LibreOffice.")
+
+
+def pdf_path_for(docx_path, output_dir):
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+
+
+def find_word_files(sources, output_dir=None):
+    """(docx_path, pdf_path) pairs for files and directories, searched recursively.
+
+    Directories are mirrored into output_dir; PDFs go next to their document
+    by default.
+    """
+    jobs = []
+    for source in sources:
+        if os.path.isdir(source):
+            for dirpath, dirnames, filenames in os.walk(source):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    # ~$ files are Word's lock files for open documents
+                    if name.lower().endswith(WORD_EXTENSIONS) and not name.startswith("~$"):
+                        relative_dir = os.path.relpath(dirpath, source)
+                        jobs.append((os.path.join(dirpath, name),
+                                     pdf_path_for(name, os.path.join(output_dir or source, relative_dir))))
+        else:
+            jobs.append((source, pdf_path_for(source, output_dir or os.path.dirname(source))))
+    return jobs
+
+
+def _result(pdf_path, error):
+    return pdf_path, 0 if error else count_pdf_pages(pdf_path), error
+
+
+def _convert_libreoffice_batch(binary, profile_dir, jobs):
+    # One process converts every (docx_path, pdf_path) job into a private
+    # directory, where LibreOffice names each PDF after its document's stem
+    # (unique within a batch); each is then moved to its pdf_path. A job
+    # without a PDF afterwards is converted again on its own to get its
+    # error message.
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        command = [binary, "-env:UserInstallation=" + pathlib.Path(profile_dir).as_uri(), "--headless", "--norestore",
+                   "--convert-to", "pdf", "--outdir", output_dir]
+        try:
+            subprocess.run(command + [docx_path for docx_path, _ in jobs], capture_output=True, text=True,
+                           timeout=DOCUMENT_TIMEOUT * len(jobs))
+        except subprocess.TimeoutExpired:
+            pass
+
+        for docx_path, pdf_path in jobs:
+            error = None
+            converted = os.path.join(output_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+            if not os.path.exists(converted):
+                try:
+                    process = subprocess.run(command + [docx_path], capture_output=True, text=True, timeout=DOCUMENT_TIMEOUT)
+                    if not os.path.exists(converted):
+                        error = process.stderr.strip() or f"LibreOffice exited with status {process.returncode}"
+                except subprocess.TimeoutExpired:
+                    error = f"Timed out after {DOCUMENT_TIMEOUT}s"
+            if error is None:
+                # Output directories are often on another file system than the temporary one
+                shutil.move(converted, pdf_path)
+            results.append(_result(pdf_path, error))
+    return results
+
+
+def _convert_docx2pdf(jobs):
+    from docx2pdf import convert
+    results = []
+    for docx_path, pdf_path in jobs:
+        try:
+            convert(docx_path, pdf_path)
+            error = None if os.path.exists(pdf_path) else "Word did not write a PDF"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append(_result(pdf_path, error))
+    return results
+
+
+def _batches(jobs, size):
+    # LibreOffice names its output after the document's stem, so documents
+    # sharing a stem go to different batches: the nth document with a stem
+    # is batched with the other nth ones. Stems are compared ignoring case,
+    # as on Windows and macOS file systems.
+    rounds = []
+    seen = {}
+    for job in jobs:
+        stem = os.path.splitext(os.path.basename(job[0]))[0].lower()
+        occurrence = seen.get(stem, 0)
+        seen[stem] = occurrence + 1
+        if occurrence == len(rounds):
+            rounds.append([])
+        rounds[occurrence].append(job)
+    for group in rounds:
+        for i in range(0, len(group), size):
+            yield group[i:i + size]
+
+
+def convert_batch(jobs, backend=None, workers=None, progress_callback=None):
+    """Convert every ``(docx_path, pdf_path)`` pair.
+
+    ``workers`` bounds how many LibreOffice processes run at once (default:
+    one per core). ``progress_callback(done, total)`` is called from the
+    calling thread after each document. Returns ``{"documents", "pages",
+    "failed", "seconds"}`` with failed as (docx_path, error) pairs; a document
+    that fails does not stop the batch.
+    """
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    jobs = list(jobs)
+    total = len(jobs)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    summary = {"documents": 0, "pages": 0, "failed": [], "seconds": 0.0}
+    sources = {pdf_path: docx_path for docx_path, pdf_path in jobs}
+    for _, pdf_path in jobs:
+        os.makedirs(os.path.dirname(pdf_path) or ".", exist_ok=True)
+
+    def record(done, result):
+        pdf_path, pages, error = result
+        if error:
+            summary["failed"].append((sources[pdf_path], error))
+        else:
+            summary["documents"] += 1
+            summary["pages"] += pages
+        if progress_callback:
+            progress_callback(done, total)
+
+    if backend == "docx2pdf":
+        # Word is one application instance, so documents go one at a time
+        for done, job in enumerate(jobs, start=1):
+            record(done, _convert_docx2pdf([job])[0])
+    else:
+        binary = find_libreoffice()
+        if binary is None:
+            raise RuntimeError("LibreOffice was not found on PATH.")
+        # Small batches keep every worker busy; large ones spread a process
+        # start over up to LIBREOFFICE_BATCH_SIZE documents
+        size = max(1, min(LIBREOFFICE_BATCH_SIZE, -(-total // workers)))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiles = queue.Queue()
+            for index in range(workers):
+                profiles.put(os.path.join(temp_dir, f"profile{index}"))
+
+            def convert(batch):
+                profile_dir = profiles.get()
+                try:
+                    return _convert_libreoffice_batch(binary, profile_dir, batch)
+                finally:
+                    profiles.put(profile_dir)
+
+            done = 0
+            # Threads only wait on the LibreOffice processes
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for results in executor.map(convert, _batches(jobs, size)):
+                    for result in results:
+                        done += 1
+                        record(done, result)
+
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def format_batch_summary(summary, backend):
+    seconds = summary["seconds"] or 1e-9
+    lines = [
+        f"Converted {summary['documents']} documents ({summary['pages']} pages) with {backend} in {summary['seconds']:.2f}s "
+        f"({summary['documents'] / seconds:.1f} documents/s)"
+    ]
+    if summary["failed"]:
+        lines.append(f"{len(summary['failed'])} documents failed:")
+        lines.extend(f"  {path}: {error}" for path, error in summary["failed"])
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Word documents to PDF without the GUI.")
+    parser.add_argument("sources", nargs="+", help=".docx files or directories to convert.")
+    parser.add_argument("-o", "--output-dir", default=None, help="Directory for the PDF files (default: next to each document).")
+    parser.add_argument("--backend", choices=BACKENDS, default=None, help="Converter (default: docx2pdf where Word is available, else LibreOffice).")
+    parser.add_argument("--workers", type=int, default=None, help="LibreOffice processes run at once (default: one per CPU core).")
+    args = parser.parse_args()
+
+    missing = [source for source in args.sources if not os.path.exists(source)]
+    if missing:
+        print(f"Not found: {', '.join(missing)}")
+        sys.exit(1)
+    try:
+        backend = args.backend or default_backend()
+        summary = convert_batch(find_word_files(args.sources, args.output_dir), backend, args.workers)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    print(format_batch_summary(summary, backend))
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,117 @@
+import time
+# --startup-timing measures time-to-first-window from here
+STARTUP_TIME = time.perf_counter()
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+import tkinter.font as tkfont
 from tkinterdnd2 import DND_FILES, TkinterDnD
-from docx2pdf import convert
 from threading import Thread
+import argparse
+import ctypes
+import ctypes.util
+import json
 import os
-import requests
+import queue
+import re
+import sys
+
+from word_to_pdf import convert_batch, pdf_path_for
+
+# How often (ms) the window checks for progress from the conversion thread
+PROGRESS_POLL_MS = 100
+
+# The window opens in FALLBACK_FAMILY and switches to FONT_FAMILY once its
+# files are loaded from the font cache, or downloaded into it, in the background
+FONT_FAMILY = "Poppins"
+FALLBACK_FAMILY = "Helvetica"
+FONT_SIZE = 12
+GOOGLE_FONTS_CSS_URL = "https://fonts.googleapis.com/css2?family={family}&display=swap"
+FONT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                              "python-convertors", "fonts")
+# Bump when the layout of a cache entry changes; entries of other versions are ignored
+FONT_CACHE_VERSION = 1
+# Cached fonts older than this (seconds) are still used, and refreshed for the next launch
+FONT_MAX_AGE = 30 * 24 * 60 * 60
+FONT_FETCH_TIMEOUT = 10
+FONT_POLL_MS = 100
+# Google Fonts serves TrueType files to clients it does not recognise as browsers
+_TRUETYPE_URL = re.compile(r"url\((https?://[^)]+)\)\s*format\(['\"]truetype['\"]\)")
+
+def font_cache_entry(font_name):
+    return os.path.join(FONT_CACHE_DIR, f"v{FONT_CACHE_VERSION}", font_name.replace(' ', '_'))
+
+def _write_atomic(path, data):
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+def load_cached_font(font_name):
+    # (font file paths, time fetched) from the cache, or None
+    entry_dir = font_cache_entry(font_name)
+    try:
+        with open(os.path.join(entry_dir, "entry.json"), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        paths = [os.path.join(entry_dir, name) for name in entry["files"]]
+        if entry["version"] != FONT_CACHE_VERSION or not paths or not all(os.path.exists(path) for path in paths):
+            return None
+        return paths, entry["fetched"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
 
 # Function to add Google Fonts
 def fetch_google_font(font_name):
-    font_url = f"https://fonts.googleapis.com/css2?family={font_name.replace(' ', '+')}&display=swap"
+    """Download the font's TrueType files into the font cache and return their paths, or None."""
+    import requests  # only needed once the window is up
+    font_url = GOOGLE_FONTS_CSS_URL.format(family=font_name.replace(' ', '+'))
+    entry_dir = font_cache_entry(font_name)
     try:
-        response = requests.get(font_url)
+        response = requests.get(font_url, timeout=FONT_FETCH_TIMEOUT)
         response.raise_for_status()
-        with open(f"{font_name.replace(' ', '_')}.css", "w") as f:
-            f.write(response.text)
-        return True
-    except requests.exceptions.RequestException as e:
+        urls = _TRUETYPE_URL.findall(response.text)
+        if not urls:
+            print(f"Failed to fetch Google Font: no TrueType files for {font_name}")
+            return None
+        os.makedirs(entry_dir, exist_ok=True)
+        files = []
+        for index, url in enumerate(urls):
+            font_file = requests.get(url, timeout=FONT_FETCH_TIMEOUT)
+            font_file.raise_for_status()
+            files.append(f"{font_name.replace(' ', '_')}-{index}.ttf")
+            _write_atomic(os.path.join(entry_dir, files[-1]), font_file.content)
+        # Written last, so an interrupted download is never used
+        entry = {"version": FONT_CACHE_VERSION, "family": font_name, "source": font_url, "fetched": time.time(), "files": files}
+        _write_atomic(os.path.join(entry_dir, "entry.json"), json.dumps(entry).encode("utf-8"))
+    except (requests.exceptions.RequestException, OSError) as e:
         print(f"Failed to fetch Google Font: {e}")
-        return False
+        return None
+    return [os.path.join(entry_dir, name) for name in files]
 
-# Fetch the Google Font "Poppins"
-fetch_google_font("Poppins")
+def prefetch_font(font_name, results):
+    # Runs on a background thread and puts exactly one result, the font files
+    # or None, on the results queue
+    cached = load_cached_font(font_name)
+    if cached is None:
+        results.put(fetch_google_font(font_name))
+        return
+    results.put(cached[0])
+    if time.time() - cached[1] > FONT_MAX_AGE:
+        fetch_google_font(font_name)
+
+def register_font_files(paths):
+    # Makes the files usable by Tk in this process only: GDI on Windows,
+    # fontconfig on X11. Returns False where neither is available (macOS).
+    try:
+        if sys.platform == "win32":
+            FR_PRIVATE = 0x10
+            return all(ctypes.windll.gdi32.AddFontResourceExW(path, FR_PRIVATE, 0) for path in paths)
+        library = ctypes.util.find_library("fontconfig")
+        if library is None:
+            return False
+        fontconfig = ctypes.CDLL(library)
+        return all(fontconfig.FcConfigAppFontAddFile(None, os.fsencode(path)) for path in paths)
+    except (OSError, AttributeError):
+        return False
 
 class WordToPDFConverter(TkinterDnD.Tk):
     def __init__(self):
@@ -32,9 +123,16 @@ class WordToPDFConverter(TkinterDnD.Tk):
 
         self.input_files = []
         self.output_folder = os.getcwd()
+        # Progress events from the conversion thread; Tk widgets may only be
+        # touched from the main thread
+        self.events = queue.Queue()
 
-        # Load custom font
-        self.font = ("Poppins", 12)
+        # Start with the fallback font; poll_font switches every widget to
+        # FONT_FAMILY once the background thread has its files
+        self.font = tkfont.Font(self, family=FALLBACK_FAMILY, size=FONT_SIZE)
+        self.font_results = queue.Queue()
+        Thread(target=prefetch_font, args=(FONT_FAMILY, self.font_results), daemon=True).start()
+        self.after(FONT_POLL_MS, self.poll_font)
 
         # Input Frame
         self.input_frame = tk.Frame(self, bg="#f0f4f8")
@@ -77,6 +175,15 @@ class WordToPDFConverter(TkinterDnD.Tk):
         self.convert_button.pack(pady=20)
         self.add_neomorphism_effect(self.convert_button, inset=False)
 
+    def poll_font(self):
+        try:
+            paths = self.font_results.get_nowait()
+        except queue.Empty:
+            self.after(FONT_POLL_MS, self.poll_font)
+            return
+        if paths and register_font_files(paths) and FONT_FAMILY in tkfont.families(self):
+            self.font.configure(family=FONT_FAMILY)
+
     def add_neomorphism_effect(self, widget, inset=True):
         widget.config(bd=0, highlightthickness=0)
         if inset:
@@ -123,26 +230,57 @@ class WordToPDFConverter(TkinterDnD.Tk):
         self.browse_button.config(state="disabled")
         self.browse_output_button.config(state="disabled")
 
-        thread = Thread(target=self.perform_conversion)
+        jobs = [(file, pdf_path_for(file, self.output_folder)) for file in self.input_files]
+        thread = Thread(target=self.perform_conversion, args=(jobs,), daemon=True)
         thread.start()
+        self.after(PROGRESS_POLL_MS, self.poll_progress)
 
-    def perform_conversion(self):
+    def perform_conversion(self, jobs):
+        # Runs on the conversion thread and only talks to the GUI through self.events
         try:
-            for idx, file in enumerate(self.input_files):
-                output_file = os.path.join(self.output_folder, os.path.basename(file).replace(".docx", ".pdf"))
-                convert(file, output_file)
-                self.progress_bar["value"] = idx + 1
-                self.update_idletasks()
-            
-            messagebox.showinfo("Conversion Complete", "All files have been converted to PDF.")
+            summary = convert_batch(jobs, progress_callback=lambda done, total: self.events.put(("progress", done, total)))
+            self.events.put(("done", summary))
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred during conversion: {e}")
-        finally:
-            self.progress_label.config(text="")
-            self.convert_button.config(state="normal")
-            self.browse_button.config(state="normal")
-            self.browse_output_button.config(state="normal")
+            self.events.put(("error", e))
+
+    def poll_progress(self):
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                self.after(PROGRESS_POLL_MS, self.poll_progress)
+                return
+            if event[0] == "progress":
+                _, done, total = event
+                self.progress_bar["value"] = done
+                self.progress_label.config(text=f"Converted {done} of {total} files...")
+            else:
+                break
+
+        self.progress_label.config(text="")
+        self.convert_button.config(state="normal")
+        self.browse_button.config(state="normal")
+        self.browse_output_button.config(state="normal")
+        if event[0] == "error":
+            messagebox.showerror("Error", f"An error occurred during conversion: {event[1]}")
+        elif event[1]["failed"]:
+            failed = "\n".join(f"{os.path.basename(path)}: {error}" for path, error in event[1]["failed"][:10])
+            messagebox.showwarning("Conversion Complete", f"{len(event[1]['failed'])} files could not be converted:\n{failed}")
+        else:
+            messagebox.showinfo("Conversion Complete", "All files have been converted to PDF.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Word documents to PDF.")
+    parser.add_argument("--startup-timing", action="store_true", help="Print the time until the window is drawn, then exit.")
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     app = WordToPDFConverter()
+    if args.startup_timing:
+        app.update()
+        print(f"Time to first window: {(time.perf_counter() - STARTUP_TIME) * 1000:.0f} ms")
+        app.destroy()
+        return
     app.mainloop()
+
+if __name__ == "__main__":
+    main()